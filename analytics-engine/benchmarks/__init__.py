@@ -0,0 +1,6 @@
+"""
+Benchmarks for the CloudQuery Analytics Engine.
+
+Run individual benchmarks as modules from the analytics-engine directory,
+e.g. ``python -m benchmarks.storage_codec``.
+"""
@@ -0,0 +1,265 @@
+"""
+Load generator for the analysis API.
+
+Sends /analyze requests at a target rate with a realistic mix of locations,
+dates and options, then reports throughput, error rate and p50/p95/p99
+latency overall and per pipeline stage, using the Server-Timing header the
+API returns. Arrivals are open-loop (Poisson at the target rate) and latency
+is measured from each request's scheduled start, so a saturated server shows
+up as queueing rather than as a lower request rate.
+
+Run the server in replay mode so no real upstream is called, e.g.:
+
+    UPSTREAM_MODE=replay REPLAY_POWER_LATENCY_MS=1500 REPLAY_LLM_LATENCY_MS=2500 python run.py
+
+Usage:
+    python -m benchmarks.load_test [--url URL] [--rate N] [--duration S] [--from-fixtures]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from config.settings import settings
+from src.core.upstream_recorder import upstream_recorder
+
+
+# Popular destinations, most requested first
+CITIES = [
+    (40.7128, -74.0060), (51.5074, -0.1278), (48.8566, 2.3522), (35.6762, 139.6503),
+    (34.0522, -118.2437), (41.9028, 12.4964), (-33.8688, 151.2093), (52.5200, 13.4050),
+    (40.4168, -3.7038), (37.7749, -122.4194), (25.2048, 55.2708), (1.3521, 103.8198),
+    (19.4326, -99.1332), (-22.9068, -43.1729), (30.0444, 31.2357), (43.6532, -79.3832),
+    (55.7558, 37.6173), (28.6139, 77.2090), (-34.6037, -58.3816), (59.3293, 18.0686),
+    (47.3769, 8.5417), (64.1466, -21.9426), (-1.2921, 36.8219), (21.3069, -157.8583),
+    (46.8523, -121.7603), (36.1069, -112.1129), (27.9881, 86.9250), (-13.1631, -72.5450)
+]
+
+ACTIVITIES = [
+    ("Outdoor Picnic", "A casual picnic in a park with family"),
+    ("Hiking", "A full-day hike on mountain trails"),
+    ("Wedding", "An outdoor wedding ceremony and reception"),
+    ("Cycling", "A 60 km road cycling tour"),
+    ("Beach Day", "Swimming and sunbathing at the beach"),
+    ("Ski Trip", "A day of downhill skiing")
+]
+
+STAGES = ["admission", "fetch", "load", "harmonize", "analyze", "llm", "total"]
+
+
+def _zipf_weights(count: int, exponent: float) -> List[float]:
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+
+class RequestMix:
+    """Draws analysis requests with skewed location popularity and near-term dates."""
+
+    def __init__(self, locations: List[Tuple[float, float]], zipf_exponent: float,
+                 get_share: float, option_share: float, seed: int):
+        self.locations = locations
+        self.weights = _zipf_weights(len(locations), zipf_exponent)
+        self.get_share = get_share
+        self.option_share = option_share
+        self.random = random.Random(seed)
+
+    def _target_date(self) -> str:
+        # Most users plan within the next month; some look months ahead.
+        roll = self.random.random()
+        if roll < 0.6:
+            days = self.random.randint(1, 30)
+        elif roll < 0.9:
+            days = self.random.randint(31, 180)
+        else:
+            days = self.random.randint(181, 365)
+        return (date.today() + timedelta(days=days)).isoformat()
+
+    def next(self) -> Tuple[str, Dict[str, Any]]:
+        """Return the HTTP method and request fields of the next request."""
+        latitude, longitude = self.random.choices(self.locations, self.weights)[0]
+        activity, description = self.random.choice(ACTIVITIES)
+        request = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "target_date": self._target_date(),
+            "user_activity": activity,
+            "user_activity_desc": description
+        }
+        if self.random.random() < self.option_share:
+            request.update(recent_years=10, include_trend=True)
+        method = "GET" if self.random.random() < self.get_share else "POST"
+        return method, request
+
+
+def parse_server_timing(header: Optional[str]) -> Tuple[Dict[str, float], List[str]]:
+    """Parse a Server-Timing header into stage durations (ms) and failed stages."""
+    durations, failed = {}, []
+    for entry in (header or "").split(","):
+        parts = [part.strip() for part in entry.split(";")]
+        if not parts[0]:
+            continue
+        for part in parts[1:]:
+            if part.startswith("dur="):
+                durations[parts[0]] = float(part[4:])
+            elif part == 'desc="failed"':
+                failed.append(parts[0])
+    return durations, failed
+
+
+class Results:
+    """Thread-safe collection of per-request outcomes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.stage_latencies: Dict[str, List[float]] = {name: [] for name in STAGES}
+        self.stage_failures: Dict[str, int] = {name: 0 for name in STAGES}
+        self.statuses: Dict[str, int] = {}
+        self.cache_hits = 0
+        self.errors = 0
+
+    def add(self, latency_ms: float, status: str, ok: bool,
+            durations: Dict[str, float], failed: List[str], cache_hit: bool):
+        with self._lock:
+            self.latencies.append(latency_ms)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.errors += not ok
+            self.cache_hits += cache_hit
+            for name, value in durations.items():
+                self.stage_latencies.setdefault(name, []).append(value)
+            for name in failed:
+                self.stage_failures[name] = self.stage_failures.get(name, 0) + 1
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def send(session: requests.Session, url: str, method: str, fields: Dict[str, Any],
+         scheduled: float, results: Results):
+    """Send one request and record its outcome, timing from its scheduled start."""
+    try:
+        if method == "GET":
+            response = session.get(f"{url}/analyze", params=fields, timeout=120)
+        else:
+            response = session.post(f"{url}/analyze", json=fields, timeout=120)
+        status = str(response.status_code)
+        ok = response.status_code < 400 and response.json().get("success", False)
+        durations, failed = parse_server_timing(response.headers.get("Server-Timing"))
+        cache_hit = response.headers.get("X-Cache") == "HIT"
+    except (requests.exceptions.RequestException, ValueError) as e:
+        status, ok, durations, failed, cache_hit = type(e).__name__, False, {}, [], False
+    results.add((time.perf_counter() - scheduled) * 1000, status, ok, durations, failed, cache_hit)
+
+
+def run(url: str, rate: float, duration: float, concurrency: int, mix: RequestMix) -> Dict[str, Any]:
+    """Drive the API for duration seconds and return the report."""
+    results = Results()
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+    arrivals = random.Random(mix.random.random())
+
+    start = time.perf_counter()
+    sent = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        scheduled = start
+        while scheduled - start < duration:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            method, fields = mix.next()
+            pool.submit(send, session, url, method, fields, scheduled, results)
+            sent += 1
+            scheduled += arrivals.expovariate(rate)
+    elapsed = time.perf_counter() - start
+
+    completed = len(results.latencies)
+    stages = {}
+    for name in STAGES:
+        values = results.stage_latencies.get(name, [])
+        if values:
+            stages[name] = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 0.50), 1),
+                "p95_ms": round(percentile(values, 0.95), 1),
+                "p99_ms": round(percentile(values, 0.99), 1),
+                "error_rate": round(results.stage_failures.get(name, 0) / len(values), 4)
+            }
+    return {
+        "sent": sent,
+        "completed": completed,
+        "elapsed_seconds": round(elapsed, 2),
+        "throughput_rps": round((completed - results.errors) / elapsed, 2),
+        "error_rate": round(results.errors / completed, 4) if completed else 0,
+        "cache_hit_rate": round(results.cache_hits / completed, 4) if completed else 0,
+        "statuses": results.statuses,
+        "latency": {
+            "p50_ms": round(percentile(results.latencies, 0.50), 1),
+            "p95_ms": round(percentile(results.latencies, 0.95), 1),
+            "p99_ms": round(percentile(results.latencies, 0.99), 1)
+        } if completed else {},
+        "stages": stages
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    """Print a load test report as a summary and a per-stage table."""
+    print(f"Sent: {report['sent']}   completed: {report['completed']}   "
+          f"elapsed: {report['elapsed_seconds']} s")
+    print(f"Throughput: {report['throughput_rps']} successful req/s   "
+          f"error rate: {report['error_rate'] * 100:.2f}%   "
+          f"cache hits: {report['cache_hit_rate'] * 100:.1f}%")
+    print(f"Statuses: {report['statuses']}")
+    print()
+    print(f"{'stage':<10} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    rows = [("client", {**report["latency"], "count": report["completed"],
+                        "error_rate": report["error_rate"]})] if report["latency"] else []
+    rows += list(report["stages"].items())
+    for name, row in rows:
+        print(f"{name:<10} {row['count']:>7} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+              f"{row['p99_ms']:>9.1f} {row['error_rate'] * 100:>7.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=f"http://127.0.0.1:{settings.PORT}", help="API base URL")
+    parser.add_argument("--rate", type=float, default=10, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30, help="Test duration in seconds")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum requests in flight")
+    parser.add_argument("--zipf", type=float, default=1.1,
+                        help="Skew of location popularity (0 for uniform)")
+    parser.add_argument("--get-share", type=float, default=0.3,
+                        help="Share of requests sent as GET instead of POST")
+    parser.add_argument("--option-share", type=float, default=0.1,
+                        help="Share of requests asking for recent years and trends")
+    parser.add_argument("--from-fixtures", action="store_true",
+                        help="Draw locations from the recorded NASA POWER fixtures")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the request mix")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    locations = CITIES
+    if args.from_fixtures:
+        locations = upstream_recorder.power_fixtures.cells()
+        if not locations:
+            parser.error(f"No recorded fixtures found under {settings.UPSTREAM_FIXTURE_DIR}.")
+        random.Random(args.seed).shuffle(locations)
+
+    mix = RequestMix(locations, args.zipf, args.get_share, args.option_share, args.seed)
+    report = run(args.url, args.rate, args.duration, args.concurrency, mix)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Memory budget check for the analysis pipeline.
+
+Measures the peak memory allocated by each pipeline stage for one synthetic
+grid cell with tracemalloc and compares it with a fixed budget, exiting with
+a non-zero status if any stage is over budget so it can gate CI. The budgets
+assume the default 1984-2024 date range and the default metrics.
+
+Usage:
+    python -m benchmarks.memory_budget [--repeat N]
+"""
+
+import argparse
+import sys
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.storage_codec import synthetic_cell
+from src.core.data_harmonizer import POWER_COLUMN_NAMES, harmonize_data
+from src.core.parameter_store import assemble_raw_data
+from src.core.weather_analyzer import analyze_historical_data, analyze_year_matrix
+from src.core.year_matrix import YearMatrix
+
+
+# Peak allocation allowed per stage, in KiB. The year matrices alone take
+# about 840 KiB (41 years × 366 days × 7 columns of float64).
+BUDGETS_KIB = {
+    "assemble_raw_data": 256,
+    "harmonize_data": 448,
+    "YearMatrix.from_columns": 1152,
+    "analyze_year_matrix": 40,
+    "analyze_year_matrix (yearly, trend)": 128,
+    "analyze_historical_data": 1152
+}
+
+
+def peak_allocation(function: Callable[[], object], repeat: int) -> int:
+    """Return the largest peak allocation in bytes over repeat calls of function."""
+    function()  # Warm up lazy imports and one-time caches
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        try:
+            function()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    return peak
+
+
+def stages() -> List[Tuple[str, Callable[[], object]]]:
+    """Return the pipeline stages to measure, each bound to the same synthetic cell."""
+    cell = synthetic_cell(seed=0)
+    dates = cell.pop("dates").astype("int32")
+    raw_data = assemble_raw_data(dates, cell)
+    harmonized = harmonize_data(raw_data)
+    matrix = YearMatrix.from_columns(
+        dates, {POWER_COLUMN_NAMES[name]: values for name, values in cell.items()}
+    )
+    return [
+        ("assemble_raw_data", lambda: assemble_raw_data(dates, cell)),
+        ("harmonize_data", lambda: harmonize_data(raw_data)),
+        ("YearMatrix.from_columns", lambda: YearMatrix.from_columns(
+            dates, {POWER_COLUMN_NAMES[name]: values for name, values in cell.items()}
+        )),
+        ("analyze_year_matrix", lambda: analyze_year_matrix(matrix, "2025-07-01")),
+        ("analyze_year_matrix (yearly, trend)", lambda: analyze_year_matrix(
+            matrix, "2025-01-03", recent_years=20, include_yearly=True, include_trend=True
+        )),
+        ("analyze_historical_data", lambda: analyze_historical_data(harmonized, "2025-07-01"))
+    ]
+
+
+def run(repeat: int) -> Dict[str, int]:
+    """Measure every stage, print a summary table and return the peaks in bytes."""
+    peaks = {}
+    print(f"{'stage':<38} {'peak KiB':>9} {'budget KiB':>11}")
+    for name, function in stages():
+        peaks[name] = peak_allocation(function, repeat)
+        budget = BUDGETS_KIB[name]
+        status = "ok" if peaks[name] <= budget * 1024 else "OVER BUDGET"
+        print(f"{name:<38} {peaks[name] / 1024:>9.1f} {budget:>11}  {status}")
+    return peaks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3, help="Measurements per stage")
+    args = parser.parse_args()
+
+    peaks = run(args.repeat)
+    if any(peaks[name] > BUDGETS_KIB[name] * 1024 for name in peaks):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Storage codec benchmark.
+
+Reports the on-disk size per grid cell and the encode/decode throughput of
+each available column codec, using either cells already stored under
+DATA_CACHE_DIR or synthetic series with realistic daily weather structure.
+
+Usage:
+    python -m benchmarks.storage_codec [--cells N] [--from-cache]
+"""
+
+import argparse
+import glob
+import os
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+from config.settings import settings
+from src.core.column_codec import available_codecs, decode_column, encode_column
+
+
+def _dates() -> np.ndarray:
+    """Return YYYYMMDD integers for the configured date range."""
+    start = date(int(settings.NASA_POWER_START_DATE[:4]),
+                 int(settings.NASA_POWER_START_DATE[4:6]),
+                 int(settings.NASA_POWER_START_DATE[6:]))
+    end = date(int(settings.NASA_POWER_END_DATE[:4]),
+               int(settings.NASA_POWER_END_DATE[4:6]),
+               int(settings.NASA_POWER_END_DATE[6:]))
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    return np.array([d.year * 10000 + d.month * 100 + d.day for d in days], dtype=np.int64)
+
+
+def synthetic_cell(seed: int) -> Dict[str, np.ndarray]:
+    """Generate one cell of plausible daily series, rounded like POWER CSV output."""
+    rng = np.random.default_rng(seed)
+    dates = _dates()
+    n = len(dates)
+    season = np.sin(2 * np.pi * np.arange(n) / 365.25 + rng.uniform(0, 2 * np.pi))
+
+    def smooth_noise(scale: float) -> np.ndarray:
+        noise = rng.normal(0, scale, n)
+        for i in range(1, n):
+            noise[i] += 0.7 * noise[i - 1]
+        return noise
+
+    t2m = 12 + 10 * season + smooth_noise(1.5)
+    rain = np.where(rng.random(n) < 0.4, rng.gamma(0.8, 6, n), 0.0)
+    wind = np.abs(3 + smooth_noise(0.6))
+    columns = {
+        "T2M": t2m,
+        "T2M_MAX": t2m + np.abs(4 + smooth_noise(0.8)),
+        "T2M_MIN": t2m - np.abs(4 + smooth_noise(0.8)),
+        "PRECTOTCORR": rain,
+        "RH2M": np.clip(65 - 10 * season + smooth_noise(3), 5, 100),
+        "WS10M": wind,
+        "WS10M_MAX": wind + np.abs(2 + smooth_noise(0.5))
+    }
+    columns = {name: np.round(values, 2) for name, values in columns.items()}
+    columns["dates"] = dates.astype(np.float64)
+    return columns
+
+
+def cached_cells(limit: int) -> List[Dict[str, np.ndarray]]:
+    """Load up to limit cells already stored under DATA_CACHE_DIR."""
+    cells = []
+    for cell_dir in sorted(glob.glob(os.path.join(settings.DATA_CACHE_DIR, "*", "*")))[:limit]:
+        columns = {}
+        for path in glob.glob(os.path.join(cell_dir, "*.col")):
+            with open(path, "rb") as handle:
+                columns[os.path.basename(path)[:-4]] = decode_column(handle.read())
+        if columns:
+            cells.append(columns)
+    return cells
+
+
+def csv_size(cell: Dict[str, np.ndarray]) -> int:
+    """Approximate the size of the same cell as POWER CSV rows."""
+    names = [name for name in cell if name != "dates"]
+    sample = ",".join(f"{cell[name][0]:.2f}" for name in names)
+    # YEAR,MO,DY prefix is about 11 characters plus a newline.
+    return len(cell["dates"]) * (len(sample) + 12)
+
+
+def run(cells: List[Dict[str, np.ndarray]]):
+    """Encode and decode every cell with every codec and print a summary table."""
+    raw_bytes = sum(values.nbytes for cell in cells for values in cell.values())
+    csv_bytes = sum(csv_size(cell) for cell in cells)
+    column_count = sum(len(cell) for cell in cells)
+
+    print(f"Cells: {len(cells)}   columns/cell: {column_count / len(cells):.1f}   "
+          f"rows/column: {len(next(iter(cells[0].values())))}")
+    print(f"Raw float64: {raw_bytes / len(cells) / 1024:.1f} KiB/cell   "
+          f"CSV: {csv_bytes / len(cells) / 1024:.1f} KiB/cell")
+    print()
+    print(f"{'codec':<6} {'KiB/cell':>9} {'vs f64':>7} {'vs CSV':>7} "
+          f"{'enc MB/s':>9} {'dec MB/s':>9} {'dec cells/s':>12}")
+
+    for codec in available_codecs():
+        start = time.perf_counter()
+        encoded = [[encode_column(values, codec) for values in cell.values()] for cell in cells]
+        encode_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        decoded = [[decode_column(data) for data in cell] for cell in encoded]
+        decode_seconds = time.perf_counter() - start
+
+        for cell, cell_decoded in zip(cells, decoded):
+            for values, restored in zip(cell.values(), cell_decoded):
+                assert np.array_equal(values, restored, equal_nan=True), "codec is not lossless"
+
+        stored_bytes = sum(len(data) for cell in encoded for data in cell)
+        print(f"{codec:<6} {stored_bytes / len(cells) / 1024:>9.1f} "
+              f"{raw_bytes / stored_bytes:>6.1f}x {csv_bytes / stored_bytes:>6.1f}x "
+              f"{raw_bytes / encode_seconds / 1e6:>9.0f} {raw_bytes / decode_seconds / 1e6:>9.0f} "
+              f"{len(cells) / decode_seconds:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cells", type=int, default=20, help="Number of cells to benchmark")
+    parser.add_argument("--from-cache", action="store_true",
+                        help="Use cells stored under DATA_CACHE_DIR instead of synthetic data")
+    args = parser.parse_args()
+
+    if args.from_cache:
+        cells = cached_cells(args.cells)
+        if not cells:
+            parser.error(f"No stored cells found under {settings.DATA_CACHE_DIR}.")
+    else:
+        cells = [synthetic_cell(seed) for seed in range(args.cells)]
+
+    run(cells)
+
+
+if __name__ == "__main__":
+    main()
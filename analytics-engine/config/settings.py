@@ -47,6 +47,68 @@ class Settings:
     # Gemini AI Configuration
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
     GEMINI_MODEL_NAME: str = "gemini-2.5-flash"
+    
+    # Startup Configuration
+    LAZY_IMPORTS: bool = os.getenv("LAZY_IMPORTS", "True").lower() == "true"
+    PROFILE_IMPORTS: bool = os.getenv("PROFILE_IMPORTS", "False").lower() == "true"
+    PROFILE_IMPORTS_REPORT_LIMIT: int = 20
+    PRELOAD_HOT_CELLS: int = int(os.getenv("PRELOAD_HOT_CELLS", "64"))  # Most requested stored cells loaded during warm-up
+    
+    # Data Cache Configuration
+    GRID_LAT_STEP_DEGREES: float = 0.5
+    GRID_LON_STEP_DEGREES: float = 0.625
+    DATA_CACHE_MAX_CELLS: int = int(os.getenv("DATA_CACHE_MAX_CELLS", "256"))
+    DATA_CACHE_MAX_COLUMNS: int = int(os.getenv("DATA_CACHE_MAX_COLUMNS", "32"))  # Decoded columns kept besides the year matrices
+    DATA_CACHE_DIR: str = os.getenv("DATA_CACHE_DIR", "data/power")
+    DATA_CACHE_CODEC: str = os.getenv("DATA_CACHE_CODEC", "auto")  # auto, zstd, lz4, zlib or none
+    STORAGE_DECIMAL_PLACES: int = 2  # Precision of NASA POWER CSV values
+    
+    # Response Cache Configuration
+    DATASET_VERSION: str = os.getenv("DATASET_VERSION", "power-daily-v1")
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+    RESPONSE_CACHE_TTL_SECONDS: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+    RESPONSE_MAX_AGE_SECONDS: int = int(os.getenv("RESPONSE_MAX_AGE_SECONDS", "3600"))
+    RESPONSE_SHARED_MAX_AGE_SECONDS: int = int(os.getenv("RESPONSE_SHARED_MAX_AGE_SECONDS", "86400"))
+    RESPONSE_STALE_WHILE_REVALIDATE_SECONDS: int = int(os.getenv("RESPONSE_STALE_WHILE_REVALIDATE_SECONDS", "600"))
+    RESPONSE_BASIC_MAX_AGE_SECONDS: int = int(os.getenv("RESPONSE_BASIC_MAX_AGE_SECONDS", "60"))
+    
+    # Admission Control Configuration
+    ADMISSION_MAX_UPSTREAM_FETCHES: int = int(os.getenv("ADMISSION_MAX_UPSTREAM_FETCHES", "4"))
+    ADMISSION_MAX_LLM_CALLS: int = int(os.getenv("ADMISSION_MAX_LLM_CALLS", "8"))
+    ADMISSION_MAX_QUEUED_FETCHES: int = int(os.getenv("ADMISSION_MAX_QUEUED_FETCHES", "16"))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5"))
+    ADMISSION_RETRY_AFTER_SECONDS: int = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "10"))
+    
+    # Background Job Configuration
+    JOB_DB_PATH: str = os.getenv("JOB_DB_PATH", "data/jobs.db")
+    JOB_MAX_WORKERS: int = int(os.getenv("JOB_MAX_WORKERS", "2"))
+    JOB_MAX_ITEMS: int = int(os.getenv("JOB_MAX_ITEMS", "2000"))
+    JOB_RESULT_TTL_SECONDS: int = int(os.getenv("JOB_RESULT_TTL_SECONDS", "86400"))
+    JOB_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("JOB_SWEEP_INTERVAL_SECONDS", "300"))
+    JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", "60"))  # Running jobs are reclaimed this long after their process stops renewing
+    REGION_GRID_STEP_DEGREES: float = 0.5
+    
+    # Upstream Record/Replay Configuration
+    UPSTREAM_MODE: str = os.getenv("UPSTREAM_MODE", "live")  # live, record or replay
+    UPSTREAM_FIXTURE_DIR: str = os.getenv("UPSTREAM_FIXTURE_DIR", "data/fixtures")
+    REPLAY_POWER_LATENCY_MS: float = float(os.getenv("REPLAY_POWER_LATENCY_MS", "0"))
+    REPLAY_LLM_LATENCY_MS: float = float(os.getenv("REPLAY_LLM_LATENCY_MS", "0"))
+    REPLAY_LATENCY_JITTER: float = float(os.getenv("REPLAY_LATENCY_JITTER", "0.5"))  # Share of latency that is exponentially distributed
+    REPLAY_POWER_ERROR_RATE: float = float(os.getenv("REPLAY_POWER_ERROR_RATE", "0"))
+    REPLAY_LLM_ERROR_RATE: float = float(os.getenv("REPLAY_LLM_ERROR_RATE", "0"))
+    REPLAY_SEED: Optional[int] = int(os.getenv("REPLAY_SEED")) if os.getenv("REPLAY_SEED") else None
+    
+    # Predictive Prefetch Configuration
+    PREFETCH_ENABLED: bool = os.getenv("PREFETCH_ENABLED", "True").lower() == "true"
+    PREFETCH_TOP_K: int = int(os.getenv("PREFETCH_TOP_K", "64"))
+    PREFETCH_MIN_REQUESTS: float = float(os.getenv("PREFETCH_MIN_REQUESTS", "2"))
+    PREFETCH_INTERVAL_SECONDS: int = int(os.getenv("PREFETCH_INTERVAL_SECONDS", "900"))
+    PREFETCH_MAX_FETCHES_PER_ROUND: int = int(os.getenv("PREFETCH_MAX_FETCHES_PER_ROUND", "8"))
+    PREFETCH_ROUND_SECONDS: int = int(os.getenv("PREFETCH_ROUND_SECONDS", "120"))
+    PREFETCH_DECAY_HALF_LIFE_HOURS: float = float(os.getenv("PREFETCH_DECAY_HALF_LIFE_HOURS", "72"))
+    PREFETCH_SKETCH_WIDTH: int = 2048
+    PREFETCH_SKETCH_DEPTH: int = 4
+    PREFETCH_SKETCH_PATH: str = os.getenv("PREFETCH_SKETCH_PATH", "data/prefetch_sketch.npz")
 
 
 # Global settings instance
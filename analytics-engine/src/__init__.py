@@ -4,5 +4,10 @@ CloudQuery Analytics Engine - Source Package
 Main package for weather analytics functionality.
 """
 
+from .lazy_imports import install_import_profiler
+
+# Installed before any subpackage is imported so their imports are timed too
+install_import_profiler()
+
 __version__ = "1.0.0"
 __author__ = "CloudQuery Team"
@@ -5,19 +5,44 @@ This module provides REST API endpoints for weather analysis using historical da
 from the NASA POWER API.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Any
-import uvicorn
-import sys
-import os
-
-# Add the project root to the Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import json
+import time
 
 from ..core.weather_service import get_weather_analysis
-from ..core.llm_service import llm_service
-from ..models.weather_models import WeatherAnalysisRequest, WeatherAnalysisResponse
+from ..core.llm_service import get_llm_service
+from ..core.startup import readiness, start_warm_up
+from ..core.job_queue import job_queue
+from ..core.prefetcher import prefetcher
+from ..core.stage_timing import (
+    collect_stage_timings,
+    mark_failed,
+    server_timing_header,
+    stage
+)
+from ..core.weather_analyzer import parameters_for_metrics, validate_year_options
+from ..core.admission import admission_controller, AdmissionRejected
+from ..core.response_cache import (
+    CachedResponse,
+    MODE_BASIC,
+    MODE_LLM,
+    build_cached_response,
+    etag_matches,
+    response_cache,
+    response_cache_key
+)
+from ..models.weather_models import (
+    WeatherAnalysisRequest,
+    WeatherAnalysisResponse,
+    BatchAnalysisRequest,
+    CalendarAnalysisRequest,
+    RegionAnalysisRequest,
+    JobStatusResponse
+)
 from config.settings import settings
 
 
@@ -38,6 +63,20 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def start_background_workers():
+    """Start the warm-up, which starts the prefetcher, and the background job workers."""
+    start_warm_up()
+    job_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    """Stop the background workers and persist the request counts."""
+    job_queue.stop()
+    prefetcher.stop()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -48,24 +87,143 @@ async def root():
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until warm-up has loaded heavy modules and hot cells."""
+    report = readiness.report()
+    if not report["ready"]:
+        return JSONResponse(status_code=503, content=report)
+    return report
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "weather-analytics"}
+    return {
+        "status": "healthy",
+        "service": "weather-analytics",
+        "load": admission_controller.stats(),
+        "prefetch": prefetcher.stats()
+    }
 
 
-@app.post("/analyze", response_model=WeatherAnalysisResponse)
-async def analyze_weather(request: WeatherAnalysisRequest):
+def _basic_analysis_result(result: Dict[str, Any], risk_note: str) -> Dict[str, Any]:
+    """Transform the raw analysis into the enhanced result structure without the LLM."""
+    temperature = result.get("temperature")
+    precipitation = result.get("precipitation")
+    wind = result.get("wind")
+    humidity = result.get("humidity")
+    return {
+        "suitability_score": 75,  # Default score when the LLM is not used
+        "confidence_rating": "Medium Confidence" if result.get("total_years_analyzed", 0) >= 30 else "Low Confidence",
+        "weather_conditions": {
+            "temperature": {
+                "average": temperature.get("average_c"),
+                "min": temperature.get("range_min_c"),
+                "max": temperature.get("range_max_c")
+            } if temperature is not None else None,
+            "precipitation": {
+                "average": 0,  # Not available in raw data
+                "max": precipitation.get("max_daily_mm"),
+                "probability_of_rain": precipitation.get("rain_chance_percent")
+            } if precipitation is not None else None,
+            "wind": {
+                "average_speed": wind.get("average_kmh"),
+                "max_speed": wind.get("max_kmh")
+            } if wind is not None else None,
+            "humidity": {
+                "average": humidity.get("average_percent")
+            } if humidity is not None else None
+        },
+        "recommendations": [
+            "Weather data analysis completed successfully.",
+            "Consider checking local forecasts closer to your event date.",
+            "Historical data shows typical conditions for this time period."
+        ],
+        "risk_factors": [
+            risk_note,
+            "Analysis based on raw historical data only."
+        ]
+    }
+
+
+# Analysis sections copied into the response as computed, outside weather_conditions
+_PASSTHROUGH_SECTIONS = ("solar", "cloud_cover", "snow", "year_range", "yearly", "trend")
+
+# weather_conditions entries, each named after the analysis section it is built from
+_CONDITION_SECTIONS = ("temperature", "precipitation", "wind", "humidity")
+
+
+def _with_analysis_sections(data: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Analyze historical weather data for a specific location and date.
-    
-    This endpoint fetches 40+ years of historical weather data from NASA POWER API
-    and analyzes it for a 31-day window around the target date. The results are then
-    enhanced using Gemini AI to provide contextual insights based on the user's activity.
+    Complete the response data with the analysis sections outside the fixed schema.
+
+    Sections computed by the analysis but not part of weather_conditions, such
+    as solar or the per-year breakdown, are copied in unchanged, and
+    weather_conditions entries for sections that were not requested are set
+    to null rather than left as placeholder zeros.
     """
+    conditions = data.get("weather_conditions")
+    if isinstance(conditions, dict):
+        for section in _CONDITION_SECTIONS:
+            if section not in result:
+                conditions[section] = None
+    for section in _PASSTHROUGH_SECTIONS:
+        if section in result:
+            data[section] = result[section]
+    return data
+
+
+def _cached_response(entry: CachedResponse, if_none_match: Optional[str],
+                     cache_status: str) -> Response:
+    """Serve a cached body, or 304 Not Modified if the client already has it."""
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": entry.cache_control,
+        "X-Cache": cache_status
+    }
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def _uncached_response(response: WeatherAnalysisResponse) -> Response:
+    """Serve a response that must not be stored by clients or proxies."""
+    return Response(
+        content=response.model_dump_json(),
+        media_type="application/json",
+        headers={"Cache-Control": "no-store"}
+    )
+
+
+def _store_response(key: str, response: WeatherAnalysisResponse, mode: str) -> CachedResponse:
+    """Serialize a successful response once and add it to the response cache."""
+    entry = build_cached_response(response.model_dump_json().encode("utf-8"), mode)
+    response_cache.put(key, entry)
+    return entry
+
+
+def _analyze(request: WeatherAnalysisRequest, if_none_match: Optional[str]) -> Response:
+    """Handle an analysis request, reporting per-stage durations in a Server-Timing header."""
+    with collect_stage_timings() as timings:
+        start = time.perf_counter()
+        try:
+            response = _run_analysis(request, if_none_match)
+        except HTTPException as error:
+            # Error responses carry the timings too, so shed requests can be
+            # attributed to the stage that rejected them.
+            timings["total"] = time.perf_counter() - start
+            error.headers = {**(error.headers or {}), "Server-Timing": server_timing_header(timings)}
+            raise
+        timings["total"] = time.perf_counter() - start
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
+
+
+def _run_analysis(request: WeatherAnalysisRequest, if_none_match: Optional[str]) -> Response:
+    """Run or serve from cache an analysis request shared by the GET and POST endpoints."""
     try:
         # Validate date format
-        from datetime import datetime
         try:
             datetime.strptime(request.target_date, '%Y-%m-%d')
         except ValueError:
@@ -73,75 +231,97 @@ async def analyze_weather(request: WeatherAnalysisRequest):
                 status_code=400, 
                 detail="Invalid date format. Use YYYY-MM-DD format."
             )
+
+        # Validate requested metrics and year range
+        year_options = request.year_options()
+        try:
+            parameters_for_metrics(request.metrics)
+            validate_year_options(
+                year_options["start_year"], year_options["end_year"], year_options["recent_years"]
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        prefetcher.record(request.latitude, request.longitude)
+
+        def cache_key(mode: str) -> str:
+            return response_cache_key(
+                request.latitude, request.longitude, request.target_date,
+                request.user_activity, request.user_activity_desc, mode,
+                metrics=request.metrics, year_options=year_options
+            )
+
+        llm_key = cache_key(MODE_LLM)
+        cached = response_cache.get(llm_key)
+        if cached is not None:
+            return _cached_response(cached, if_none_match, "HIT")
         
         # Perform weather analysis
-        result = get_weather_analysis(
-            latitude=request.latitude,
-            longitude=request.longitude,
-            target_date_str=request.target_date
-        )
+        try:
+            result = get_weather_analysis(
+                latitude=request.latitude,
+                longitude=request.longitude,
+                target_date_str=request.target_date,
+                metrics=request.metrics,
+                **year_options
+            )
+        except AdmissionRejected as rejection:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Service busy: {rejection}",
+                headers={"Retry-After": str(rejection.retry_after)}
+            )
         
         # Check if analysis returned an error
         if "error" in result:
-            return WeatherAnalysisResponse(
+            return _uncached_response(WeatherAnalysisResponse(
                 success=False,
                 error=result["error"]
-            )
+            ))
         
-        # Prepare data for LLM enhancement
+        # Prepare data for LLM enhancement; the per-year breakdown is returned
+        # as-is rather than sent to the model.
         analysis_data = {
             "user_activity": request.user_activity,
             "user_activity_desc": request.user_activity_desc,
-            "analysis_result": result
+            "analysis_result": {key: value for key, value in result.items() if key != "yearly"}
         }
         
-        # Enhance the analysis using Gemini AI
-        try:
-            enhanced_result = llm_service.enhance_weather_analysis(analysis_data)
-            return WeatherAnalysisResponse(
-                success=True,
-                data=enhanced_result
-            )
-        except Exception as llm_error:
-            # If LLM enhancement fails, transform the raw analysis to match expected structure
-            transformed_data = {
-                "suitability_score": 75,  # Default score when LLM fails
-                "confidence_rating": "Medium Confidence" if result.get("total_years_analyzed", 0) >= 30 else "Low Confidence",
-                "weather_conditions": {
-                    "temperature": {
-                        "average": result.get("temperature", {}).get("average_c", 0),
-                        "min": result.get("temperature", {}).get("range_min_c", 0),
-                        "max": result.get("temperature", {}).get("range_max_c", 0)
-                    },
-                    "precipitation": {
-                        "average": 0,  # Not available in raw data
-                        "max": result.get("precipitation", {}).get("max_daily_mm", 0),
-                        "probability_of_rain": result.get("precipitation", {}).get("rain_chance_percent", 0)
-                    },
-                    "wind": {
-                        "average_speed": result.get("wind", {}).get("average_kmh", 0),
-                        "max_speed": result.get("wind", {}).get("max_kmh", 0)
-                    },
-                    "humidity": {
-                        "average": result.get("humidity", {}).get("average_percent", 0)
-                    }
-                },
-                "recommendations": [
-                    "Weather data analysis completed successfully.",
-                    "Consider checking local forecasts closer to your event date.",
-                    "Historical data shows typical conditions for this time period."
-                ],
-                "risk_factors": [
-                    f"LLM enhancement unavailable: {str(llm_error)}",
-                    "Analysis based on raw historical data only."
-                ]
-            }
-            
-            return WeatherAnalysisResponse(
-                success=True,
-                data=transformed_data
-            )
+        # Enhance the analysis using Gemini AI when the LLM budget allows
+        with admission_controller.llm_call() as llm_admitted:
+            if not llm_admitted:
+                basic_key = cache_key(MODE_BASIC)
+                cached = response_cache.get(basic_key)
+                if cached is not None:
+                    return _cached_response(cached, if_none_match, "HIT")
+                cached = _store_response(basic_key, WeatherAnalysisResponse(
+                    success=True,
+                    data=_with_analysis_sections(_basic_analysis_result(
+                        result, "AI insights skipped due to high demand."
+                    ), result)
+                ), MODE_BASIC)
+                return _cached_response(cached, if_none_match, "MISS")
+            try:
+                with stage("llm"):
+                    enhanced_result = get_llm_service().enhance_weather_analysis(analysis_data)
+            except Exception as llm_error:
+                mark_failed("llm")
+                # If LLM enhancement fails, transform the raw analysis to match expected structure
+                return _uncached_response(WeatherAnalysisResponse(
+                    success=True,
+                    data=_with_analysis_sections(_basic_analysis_result(
+                        result, f"LLM enhancement unavailable: {str(llm_error)}"
+                    ), result)
+                ))
+
+        entry = _store_response(llm_key, WeatherAnalysisResponse(
+            success=True,
+            data=_with_analysis_sections(enhanced_result, result)
+        ), MODE_LLM)
+        return _cached_response(entry, if_none_match, "MISS")
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -149,7 +329,162 @@ async def analyze_weather(request: WeatherAnalysisRequest):
         )
 
 
+@app.post("/analyze", response_model=WeatherAnalysisResponse)
+def analyze_weather(request: WeatherAnalysisRequest,
+                    if_none_match: Optional[str] = Header(None)):
+    """
+    Analyze historical weather data for a specific location and date.
+    
+    This endpoint fetches 40+ years of historical weather data from NASA POWER API
+    and analyzes it for a 31-day window around the target date, optionally restricted
+    to a range of years and broken down per year with a trend. The results are then
+    enhanced using Gemini AI to provide contextual insights based on the user's activity.
+
+    Requests for locations already in the data cache are always admitted. Cold
+    requests wait briefly for an upstream fetch slot and are rejected with 503
+    and Retry-After when the service is saturated; when the LLM budget is
+    exhausted the raw analysis is returned without AI enhancement.
+
+    Successful responses carry a strong ETag and are cached per grid cell, date
+    window, dataset version and activity; send If-None-Match to get 304.
+    """
+    return _analyze(request, if_none_match)
+
+
+@app.get("/analyze", response_model=WeatherAnalysisResponse)
+def analyze_weather_get(latitude: float = Query(..., ge=-90, le=90),
+                        longitude: float = Query(..., ge=-180, le=180),
+                        target_date: str = Query(...),
+                        user_activity: str = Query(...),
+                        user_activity_desc: str = Query(...),
+                        metrics: Optional[List[str]] = Query(None),
+                        start_year: Optional[int] = Query(None),
+                        end_year: Optional[int] = Query(None),
+                        recent_years: Optional[int] = Query(None, ge=1),
+                        include_yearly: bool = Query(False),
+                        include_trend: bool = Query(False),
+                        if_none_match: Optional[str] = Header(None)):
+    """
+    Analyze historical weather data, taking the request fields as query parameters.
+
+    Identical to POST /analyze, but cacheable by CDNs and reverse proxies that
+    only store GET responses.
+    """
+    request = WeatherAnalysisRequest(
+        latitude=latitude,
+        longitude=longitude,
+        target_date=target_date,
+        user_activity=user_activity,
+        user_activity_desc=user_activity_desc,
+        metrics=metrics,
+        start_year=start_year,
+        end_year=end_year,
+        recent_years=recent_years,
+        include_yearly=include_yearly,
+        include_trend=include_trend
+    )
+    return _analyze(request, if_none_match)
+
+
+def _format_timestamp(timestamp: Optional[float]) -> Optional[str]:
+    """Format an epoch timestamp as an ISO 8601 string."""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+def _job_status(job: Dict[str, Any]) -> JobStatusResponse:
+    """Convert a job record into its API representation."""
+    total = job["total_items"]
+    return JobStatusResponse(
+        job_id=job["id"],
+        kind=job["kind"],
+        status=job["status"],
+        priority=job["priority"],
+        total_items=total,
+        completed_items=job["completed_items"],
+        failed_items=job["failed_items"],
+        progress_percent=round(job["completed_items"] / total * 100, 1) if total else 100.0,
+        error=job["error"],
+        created_at=_format_timestamp(job["created_at"]),
+        started_at=_format_timestamp(job["started_at"]),
+        finished_at=_format_timestamp(job["finished_at"]),
+        expires_at=_format_timestamp(job["expires_at"])
+    )
+
+
+def _submit_job(kind: str, params: Dict[str, Any], priority: int) -> JobStatusResponse:
+    """Queue a background job, mapping invalid parameters to a 400 response."""
+    try:
+        job = job_queue.submit(kind, params, priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _job_status(job)
+
+
+@app.post("/jobs/batch", response_model=JobStatusResponse, status_code=202)
+def submit_batch_job(request: BatchAnalysisRequest):
+    """Queue an analysis of many independent locations and dates."""
+    params = request.model_dump(exclude={"priority"})
+    return _submit_job("batch", params, request.priority)
+
+
+@app.post("/jobs/calendar", response_model=JobStatusResponse, status_code=202)
+def submit_calendar_job(request: CalendarAnalysisRequest):
+    """Queue an analysis of every date in a range for a single location."""
+    params = request.model_dump(exclude={"priority"})
+    return _submit_job("calendar", params, request.priority)
+
+
+@app.post("/jobs/region", response_model=JobStatusResponse, status_code=202)
+def submit_region_job(request: RegionAnalysisRequest):
+    """Queue an analysis of a single date over a grid of locations."""
+    params = request.model_dump(exclude={"priority"})
+    return _submit_job("region", params, request.priority)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job_status(job_id: str):
+    """Report the status and progress of a background job."""
+    job = job_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return _job_status(job)
+
+
+@app.get("/jobs/{job_id}/results")
+def stream_job_results(job_id: str, offset: int = 0, follow: bool = False):
+    """
+    Stream a job's results as newline-delimited JSON.
+
+    Partial results are available while the job is still running. Pass
+    follow=true to keep the stream open until the job finishes, and offset
+    to skip results that have already been received.
+    """
+    if job_queue.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+
+    def generate():
+        for result in job_queue.iter_results(job_id, offset=offset, follow=follow):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.delete("/jobs/{job_id}", response_model=JobStatusResponse)
+def cancel_job(job_id: str):
+    """Cancel a queued or running background job."""
+    job = job_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    if not job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}.")
+    return _job_status(job_queue.get_job(job_id))
+
+
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host=settings.HOST,
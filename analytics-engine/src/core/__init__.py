@@ -9,10 +9,21 @@ from .data_fetcher import fetch_historical_data
 from .data_harmonizer import harmonize_data
 from .weather_analyzer import analyze_historical_data
 from .weather_service import get_weather_analysis
+from .admission import AdmissionController, AdmissionRejected, admission_controller
+from .job_queue import JobQueue
+from .prefetcher import Prefetcher
+from .startup import readiness, start_warm_up
 
 __all__ = [
     "fetch_historical_data",
     "harmonize_data", 
     "analyze_historical_data",
-    "get_weather_analysis"
+    "get_weather_analysis",
+    "AdmissionController",
+    "AdmissionRejected",
+    "admission_controller",
+    "JobQueue",
+    "Prefetcher",
+    "readiness",
+    "start_warm_up"
 ]
@@ -0,0 +1,243 @@
+"""
+Admission control for the analysis pipeline.
+
+This module tracks in-flight NASA POWER fetches and LLM calls against
+configured limits. Requests that can be answered from cached data never need a
+fetch slot and are always admitted; cold requests wait a bounded time for a
+slot or are rejected fast, and LLM enhancement is skipped rather than queued
+when its budget is exhausted.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+from config.settings import settings
+from .stage_timing import mark_failed, stage
+
+
+# Longest single wait of a bounded bulk request before it rechecks its limit
+_BULK_POLL_SECONDS = 1.0
+
+# The (deadline, stop event) bounding the current thread's bulk waits, if any
+_bulk_wait_limit: ContextVar[Optional[Tuple[float, Optional[threading.Event]]]] = ContextVar(
+    "bulk_wait_limit", default=None
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted within the configured limits."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limiter for upstream data fetches and LLM calls."""
+
+    def __init__(self, max_upstream_fetches: int, max_llm_calls: int,
+                 max_queued_fetches: int, queue_timeout_seconds: float,
+                 retry_after_seconds: int):
+        """
+        Initialize the controller.
+
+        Args:
+            max_upstream_fetches: Maximum concurrent NASA POWER fetches.
+            max_llm_calls: Maximum concurrent LLM calls.
+            max_queued_fetches: Maximum interactive requests waiting for a fetch slot.
+            queue_timeout_seconds: How long an interactive request may wait for a slot.
+            retry_after_seconds: Retry-After hint returned with rejections.
+        """
+        self.max_upstream_fetches = max_upstream_fetches
+        self.max_llm_calls = max_llm_calls
+        self.max_queued_fetches = max_queued_fetches
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+
+        self._condition = threading.Condition()
+        self._fetches_in_flight = 0
+        self._llm_calls_in_flight = 0
+        self._interactive_waiting = 0
+        self.rejected_fetches = 0
+        self.downgraded_llm_calls = 0
+
+    @contextmanager
+    def bulk_wait_limit(self, deadline: float,
+                        stop: Optional[threading.Event] = None) -> Iterator[None]:
+        """
+        Bound the bulk waits made in this context.
+
+        Bulk requests otherwise wait for as long as interactive traffic keeps
+        the fetch slots busy. Inside the block they give up instead, raising
+        AdmissionRejected, once the deadline passes or the stop event is set.
+
+        Args:
+            deadline: time.monotonic() value after which waits give up.
+            stop: Event that makes waits give up when set.
+        """
+        token = _bulk_wait_limit.set((deadline, stop))
+        try:
+            yield
+        finally:
+            _bulk_wait_limit.reset(token)
+
+    def _bulk_wait_timeout(self) -> Optional[float]:
+        """
+        Return how long a bulk request may wait before rechecking, None for no limit.
+
+        Raises:
+            AdmissionRejected: If the context's deadline has passed or its stop event is set.
+        """
+        limit = _bulk_wait_limit.get()
+        if limit is None:
+            return None
+        deadline, stop = limit
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or (stop is not None and stop.is_set()):
+            raise AdmissionRejected("Background work stopped waiting for weather data.",
+                                    self.retry_after_seconds)
+        return min(remaining, _BULK_POLL_SECONDS)
+
+    def _reject(self, message: str):
+        self.rejected_fetches += 1
+        mark_failed("admission")
+        raise AdmissionRejected(message, self.retry_after_seconds)
+
+    @contextmanager
+    def upstream_fetch(self, bulk: bool = False,
+                       promoted: Optional[threading.Event] = None) -> Iterator[None]:
+        """
+        Hold an upstream fetch slot for the duration of the block.
+
+        Interactive requests wait at most queue_timeout_seconds and are rejected
+        immediately if too many are already waiting. Bulk (background job)
+        requests always yield to waiting interactive ones, and wait until a
+        slot is free or the limit set by bulk_wait_limit is reached.
+
+        Args:
+            bulk: True for background work.
+            promoted: Event set (through promote) when an interactive request
+                starts waiting on this bulk fetch's result; from then on the
+                fetch waits with interactive priority instead of yielding.
+
+        Raises:
+            AdmissionRejected: If an interactive request cannot get a slot, or
+                a bulk request reaches its wait limit.
+        """
+        with stage("admission"), self._condition:
+            interactive = not bulk
+            if interactive:
+                if (self._fetches_in_flight >= self.max_upstream_fetches
+                        and self._interactive_waiting >= self.max_queued_fetches):
+                    self._reject("Too many requests are waiting for weather data.")
+                self._interactive_waiting += 1
+
+            deadline = time.monotonic() + self.queue_timeout_seconds
+            try:
+                while True:
+                    if not interactive and promoted is not None and promoted.is_set():
+                        interactive = True
+                        self._interactive_waiting += 1
+                    if (self._fetches_in_flight < self.max_upstream_fetches
+                            and (interactive or self._interactive_waiting == 0)):
+                        break
+                    if bulk:
+                        # A promoted bulk fetch keeps its own wait limit; the
+                        # interactive requests waiting on it bound theirs.
+                        self._condition.wait(self._bulk_wait_timeout())
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject("Timed out waiting for a weather data slot.")
+                    self._condition.wait(remaining)
+            finally:
+                if interactive:
+                    self._interactive_waiting -= 1
+                    self._condition.notify_all()
+            self._fetches_in_flight += 1
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._fetches_in_flight -= 1
+                self._condition.notify_all()
+
+    def promote(self, promoted: threading.Event):
+        """Give a bulk fetch waiting for a slot interactive priority; see upstream_fetch."""
+        with self._condition:
+            promoted.set()
+            self._condition.notify_all()
+
+    def wait_for_shared_fetch(self, done: threading.Event, bulk: bool = False):
+        """
+        Wait for a fetch that another request started for the same data.
+
+        Interactive requests wait at most queue_timeout_seconds, as they would
+        for a fetch slot; bulk requests wait until the fetch finishes or the
+        limit set by bulk_wait_limit is reached.
+
+        Raises:
+            AdmissionRejected: If an interactive request times out, or a bulk
+                request reaches its wait limit.
+        """
+        with stage("admission"):
+            if bulk:
+                while not done.wait(self._bulk_wait_timeout()):
+                    pass
+            elif not done.wait(self.queue_timeout_seconds):
+                with self._condition:
+                    self._reject("Timed out waiting for weather data.")
+
+    @contextmanager
+    def llm_call(self) -> Iterator[bool]:
+        """
+        Try to take an LLM slot without waiting.
+
+        Yields:
+            True if the caller may call the LLM, False if it should fall back
+            to the non-LLM result.
+        """
+        with self._condition:
+            admitted = self._llm_calls_in_flight < self.max_llm_calls
+            if admitted:
+                self._llm_calls_in_flight += 1
+            else:
+                self.downgraded_llm_calls += 1
+
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                with self._condition:
+                    self._llm_calls_in_flight -= 1
+
+    def has_spare_fetch_capacity(self) -> bool:
+        """Return True if no interactive request is waiting and a fetch slot is free."""
+        with self._condition:
+            return (self._interactive_waiting == 0
+                    and self._fetches_in_flight < self.max_upstream_fetches)
+
+    def stats(self) -> Dict[str, int]:
+        """Return current load and rejection counters."""
+        with self._condition:
+            return {
+                "upstream_fetches_in_flight": self._fetches_in_flight,
+                "llm_calls_in_flight": self._llm_calls_in_flight,
+                "requests_waiting": self._interactive_waiting,
+                "rejected_fetches": self.rejected_fetches,
+                "downgraded_llm_calls": self.downgraded_llm_calls
+            }
+
+
+# Global admission controller instance
+admission_controller = AdmissionController(
+    max_upstream_fetches=settings.ADMISSION_MAX_UPSTREAM_FETCHES,
+    max_llm_calls=settings.ADMISSION_MAX_LLM_CALLS,
+    max_queued_fetches=settings.ADMISSION_MAX_QUEUED_FETCHES,
+    queue_timeout_seconds=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS
+)
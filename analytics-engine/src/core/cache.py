@@ -0,0 +1,102 @@
+"""
+In-memory caching utilities for the analytics pipeline.
+
+This module provides a thread-safe LRU cache and the grid-cell helper used to
+key cached data, since every coordinate inside a NASA POWER grid cell returns
+the same historical series.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from config.settings import settings
+
+
+def grid_cell(latitude: float, longitude: float) -> Tuple[float, float]:
+    """
+    Snaps coordinates to the centre of the NASA POWER grid cell containing them.
+
+    Args:
+        latitude: The latitude of the location (-90 to 90).
+        longitude: The longitude of the location (-180 to 180).
+
+    Returns:
+        A (latitude, longitude) tuple for the cell centre.
+    """
+    lat_step = settings.GRID_LAT_STEP_DEGREES
+    lon_step = settings.GRID_LON_STEP_DEGREES
+    cell_lat = round(round(latitude / lat_step) * lat_step, 4)
+    cell_lon = round(round((longitude + 180) / lon_step) * lon_step - 180, 4)
+    if cell_lon >= 180:
+        cell_lon = round(cell_lon - 360, 4)
+    return cell_lat, cell_lon
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with an optional time-to-live."""
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept before evicting the oldest.
+            ttl_seconds: Entry lifetime in seconds, or None for no expiry.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._is_expired(entry[0]):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check for a live entry without affecting recency or hit counts."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._is_expired(entry[0])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def keys(self) -> List[Hashable]:
+        """Return the cached keys, most recently used first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the entry count and hit/miss counters."""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
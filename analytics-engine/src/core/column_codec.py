@@ -0,0 +1,165 @@
+"""
+Compact binary encoding for stored historical data columns.
+
+NASA POWER publishes daily values with two decimal places, so a column is
+stored as fixed-point integers, delta-encoded against the previous day and
+packed into the narrowest integer width that fits, with missing values kept in
+a separate bitmap. The result is compressed with zstd or lz4 when available,
+falling back to zlib. Columns that are not exactly representable in fixed
+point are stored as raw float64 instead, so encoding is always lossless.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from ..lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4 = None
+
+
+_MAGIC = b"CQC1"
+# magic, codec id, mode, integer width, decimal places, row count, bitmap length
+_HEADER = struct.Struct("<4sBBBBII")
+
+_MODE_FIXED = 0
+_MODE_RAW = 1
+
+_CODEC_IDS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+_CODEC_NAMES = {codec_id: name for name, codec_id in _CODEC_IDS.items()}
+
+_INT_TYPES = ("int8", "int16", "int32", "int64")
+
+
+def _compressors() -> Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    """Return (compress, decompress) functions for each available codec."""
+    codecs = {
+        "none": (bytes, bytes),
+        "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress)
+    }
+    if zstandard is not None:
+        codecs["zstd"] = (
+            lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data)
+        )
+    if lz4 is not None:
+        codecs["lz4"] = (lz4.frame.compress, lz4.frame.decompress)
+    return codecs
+
+
+def available_codecs() -> List[str]:
+    """Return the names of the codecs usable in this environment."""
+    return list(_compressors())
+
+
+def default_codec() -> str:
+    """Return the configured codec, resolving "auto" to the best one available."""
+    codecs = _compressors()
+    configured = settings.DATA_CACHE_CODEC
+    if configured != "auto":
+        if configured not in codecs:
+            raise ValueError(f"Storage codec '{configured}' is not available.")
+        return configured
+    for name in ("zstd", "lz4", "zlib"):
+        if name in codecs:
+            return name
+    return "none"
+
+
+def encode_column(values: np.ndarray, codec: Optional[str] = None) -> bytes:
+    """
+    Encodes a numeric column.
+
+    Args:
+        values: The column values; NaN marks missing data.
+        codec: Compression codec name, or None for default_codec().
+
+    Returns:
+        The encoded bytes.
+    """
+    codec = codec or default_codec()
+    compress = _compressors()[codec][0]
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+
+    decimals = settings.STORAGE_DECIMAL_PLACES
+    scale = 10.0 ** decimals
+    present = np.where(missing, 0.0, values)
+    fixed = np.rint(present * scale)
+
+    if np.array_equal(fixed / scale, present) and np.all(np.abs(fixed) < 2 ** 52):
+        mode = _MODE_FIXED
+        fixed = fixed.astype(np.int64)
+        # Carry the previous value through gaps so they delta-encode to zero.
+        if missing.any():
+            indices = np.where(missing, 0, np.arange(len(fixed)))
+            np.maximum.accumulate(indices, out=indices)
+            fixed = fixed[indices]
+        deltas = np.diff(fixed, prepend=0)
+        for int_type in _INT_TYPES:
+            info = np.iinfo(int_type)
+            if deltas.size == 0 or (deltas.min() >= info.min and deltas.max() <= info.max):
+                break
+        width = np.dtype(int_type).itemsize
+        body = deltas.astype(int_type).tobytes()
+    else:
+        mode = _MODE_RAW
+        width = 8
+        body = values.tobytes()
+
+    bitmap = np.packbits(missing).tobytes() if missing.any() else b""
+    header = _HEADER.pack(
+        _MAGIC, _CODEC_IDS[codec], mode, width, decimals, len(values), len(bitmap)
+    )
+    return header + compress(bitmap + body)
+
+
+def decode_column(data: bytes) -> np.ndarray:
+    """
+    Decodes a column produced by encode_column.
+
+    Args:
+        data: The encoded bytes.
+
+    Returns:
+        The column as a float64 array with NaN for missing values.
+
+    Raises:
+        ValueError: If the data is not a valid column or its codec is unavailable.
+    """
+    magic, codec_id, mode, width, decimals, count, bitmap_length = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("Not an encoded column.")
+    codec = _CODEC_NAMES.get(codec_id)
+    codecs = _compressors()
+    if codec not in codecs:
+        raise ValueError(f"Column was written with unavailable codec '{codec}'.")
+
+    payload = codecs[codec][1](data[_HEADER.size:])
+    body = memoryview(payload)[bitmap_length:]
+
+    if mode == _MODE_RAW:
+        values = np.frombuffer(body, dtype=np.float64, count=count).copy()
+    else:
+        int_type = next(t for t in _INT_TYPES if np.dtype(t).itemsize == width)
+        deltas = np.frombuffer(body, dtype=int_type, count=count)
+        values = np.cumsum(deltas, dtype=np.int64) / 10.0 ** decimals
+
+    if bitmap_length:
+        bitmap = np.frombuffer(payload, dtype=np.uint8, count=bitmap_length)
+        values[np.unpackbits(bitmap, count=count).astype(bool)] = np.nan
+
+    return values
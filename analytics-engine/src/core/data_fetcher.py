@@ -5,19 +5,22 @@ This module handles fetching historical weather data from the NASA POWER API
 for specific geographical coordinates.
 """
 
-import requests
-import pandas as pd
+from __future__ import annotations
+
 import io
-from typing import Optional
-import sys
-import os
+from typing import List, Optional
 
-# Add the project root to the Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from config.settings import settings
+from ..lazy_imports import lazy_import
+from .upstream_recorder import ReplayError, upstream_recorder
+
+requests = lazy_import("requests")
+urllib3 = lazy_import("urllib3")
+pd = lazy_import("pandas")
 
 
-def fetch_historical_data(latitude: float, longitude: float) -> pd.DataFrame:
+def fetch_historical_data(latitude: float, longitude: float,
+                          parameters: Optional[List[str]] = None) -> pd.DataFrame:
     """
     Fetches 40+ years of daily historical weather data from the NASA POWER API
     for a specific location.
@@ -25,6 +28,8 @@ def fetch_historical_data(latitude: float, longitude: float) -> pd.DataFrame:
     Args:
         latitude: The latitude of the location (-90 to 90).
         longitude: The longitude of the location (-180 to 180).
+        parameters: The POWER parameters to request. Defaults to
+            settings.NASA_POWER_PARAMETERS.
 
     Returns:
         A pandas DataFrame containing the cleaned, daily historical weather data,
@@ -35,7 +40,7 @@ def fetch_historical_data(latitude: float, longitude: float) -> pd.DataFrame:
     # Define the API endpoint and parameters
     base_url = settings.NASA_POWER_BASE_URL
     params = {
-        "parameters": settings.NASA_POWER_PARAMETERS,
+        "parameters": ",".join(parameters) if parameters else settings.NASA_POWER_PARAMETERS,
         "community": settings.NASA_POWER_COMMUNITY,
         "latitude": str(latitude),
         "longitude": str(longitude),
@@ -44,38 +49,59 @@ def fetch_historical_data(latitude: float, longitude: float) -> pd.DataFrame:
         "format": settings.NASA_POWER_FORMAT
     }
 
+    # Ask for every content coding urllib3 can decode (gzip and deflate, plus
+    # br and zstd when their optional packages are installed).
+    from urllib3.util.request import ACCEPT_ENCODING
+    headers = {"Accept-Encoding": ACCEPT_ENCODING}
+
     try:
-        # Make the API request
-        response = requests.get(base_url, params=params, timeout=settings.NASA_POWER_TIMEOUT)
-        response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
-
-        # --- Data Cleaning ---
-        # The API response includes a header section we need to remove.
-        # The pure CSV data starts with the line containing the column headers.
-        raw_text = response.text
-        lines = raw_text.split('\n')
-
-        # Find the starting line of the CSV data
-        csv_start_index = -1
-        for i, line in enumerate(lines):
-            if line.strip().startswith("YEAR,MO,DY"):
-                csv_start_index = i
-                break
-        
-        if csv_start_index == -1:
-            print("Error: Could not find CSV header in API response.")
-            return pd.DataFrame()
+        # Serve recorded responses instead of calling the API when replaying
+        if upstream_recorder.replaying:
+            return upstream_recorder.replay_power(
+                latitude, longitude, params["parameters"].split(",")
+            )
 
-        # Reconstruct the clean CSV string
-        clean_csv_str = "\n".join(lines[csv_start_index:])
+        # Make the API request, streaming the body instead of buffering it
+        with requests.get(base_url, params=params, headers=headers,
+                          timeout=settings.NASA_POWER_TIMEOUT, stream=True) as response:
+            response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
 
-        # Read the clean CSV string into a pandas DataFrame
-        # The API uses -999 for missing values.
-        df = pd.read_csv(io.StringIO(clean_csv_str), na_values=[settings.MISSING_VALUE_INDICATOR])
+            # Decompress the body on the fly as the parser reads it
+            response.raw.decode_content = True
+            response.raw.auto_close = False  # Required to wrap the raw stream in TextIOWrapper
+            stream = io.TextIOWrapper(response.raw, encoding=response.encoding or "utf-8")
+
+            # --- Data Cleaning ---
+            # The API response includes a header section we need to skip.
+            # The pure CSV data starts with the line containing the column headers.
+            for line in stream:
+                if line.strip().startswith("YEAR,MO,DY"):
+                    column_names = line.strip().split(",")
+                    break
+            else:
+                print("Error: Could not find CSV header in API response.")
+                return pd.DataFrame()
+
+            # Parse the remaining CSV rows straight from the stream
+            # The API uses -999 for missing values.
+            df = pd.read_csv(
+                stream,
+                header=None,
+                names=column_names,
+                na_values=[settings.MISSING_VALUE_INDICATOR]
+            )
+
+        if upstream_recorder.recording:
+            upstream_recorder.record_power(latitude, longitude, df)
         
         print("Successfully fetched and cleaned data.")
         return df
 
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ReplayError) as e:
         print(f"An error occurred while fetching data: {e}")
         return pd.DataFrame()
+    except (urllib3.exceptions.HTTPError, pd.errors.ParserError) as e:
+        # Reading the raw stream bypasses requests' exception wrapping, so a
+        # truncated body or a mid-stream timeout surfaces as a urllib3 error.
+        print(f"An error occurred while reading the API response: {e}")
+        return pd.DataFrame()
@@ -5,44 +5,70 @@ This module handles cleaning and standardizing weather data from the NASA POWER
 into a consistent format for analysis.
 """
 
-import pandas as pd
+from __future__ import annotations
+
 from typing import Optional
 
+from ..lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+# Descriptive column names for each NASA POWER parameter
+POWER_COLUMN_NAMES = {
+    "T2M": "Avg_Temperature_C",
+    "T2M_MAX": "Max_Temperature_C",
+    "T2M_MIN": "Min_Temperature_C",
+    "PRECTOTCORR": "Precipitation_mm",
+    "RH2M": "Humidity_Percent",
+    "WS10M": "Wind_Speed_m/s",
+    "WS10M_MAX": "Max_Wind_Speed_m/s",
+    "ALLSKY_SFC_SW_DWN": "Solar_Radiation_kWh_m2",
+    "CLOUD_AMT": "Cloud_Cover_Percent",
+    "SNODP": "Snow_Depth_cm"
+}
+
+
+def _combine_date_parts(years: np.ndarray, months: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """Combine year, month and day arrays into datetime64[ns] values, updating in place."""
+    dates = (years - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+    dates += (months - 1).astype("timedelta64[M]")
+    nanoseconds = dates.astype("datetime64[D]").view(np.int64)
+    nanoseconds += days
+    nanoseconds -= 1
+    nanoseconds *= 86_400_000_000_000
+    # Nanoseconds, the unit pd.to_datetime returned under the pinned pandas
+    return nanoseconds.view("datetime64[ns]")
+
 
 def harmonize_data(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Harmonizes the historical weather data DataFrame by renaming columns,
+    Harmonizes the historical weather DataFrame by renaming columns,
     creating a date column, and reordering columns.
 
+    The result is assembled in a single step from the input's columns, which
+    are shared rather than copied, instead of through a chain of renamed and
+    reindexed intermediate frames.
+
     Args:
         df: The original pandas DataFrame containing historical weather data.
         
     Returns:
-        A harmonized pandas DataFrame.
+        A harmonized pandas DataFrame with 'Date' first.
     """
     print("Harmonizing the data...")
 
-    # Rename columns for clarity
-    df = df.rename(columns={
-        "T2M": "Avg_Temperature_C",
-        "T2M_MAX": "Max_Temperature_C",
-        "T2M_MIN": "Min_Temperature_C",
-        "PRECTOTCORR": "Precipitation_mm",
-        "RH2M": "Humidity_Percent",
-        "WS10M": "Wind_Speed_m/s",
-        "WS10M_MAX": "Max_Wind_Speed_m/s"
-    })
-
-    # Rename columns to lowercase for to_datetime compatibility
-    df = df.rename(columns={'YEAR': 'year', 'MO': 'month', 'DY': 'day'})
-    # Create a 'Date' column from 'year', 'month', 'day'
-    df['Date'] = pd.to_datetime(df[['year', 'month', 'day']])
-
-    # Drop the original 'YEAR', 'MO', 'DY' columns
-    df = df.drop(columns=['year', 'month', 'day'])
-
-    # Reorder columns to have 'Date' first
-    cols = ['Date'] + [col for col in df.columns if col != 'Date']
-    df = df[cols]
+    # Create a 'Date' column from the 'YEAR', 'MO' and 'DY' columns
+    # (the same values pd.to_datetime gives, with a fraction of its temporaries)
+    date_parts = (df['YEAR'].to_numpy(), df['MO'].to_numpy(), df['DY'].to_numpy())
+    columns = {'Date': pd.Series(_combine_date_parts(*date_parts), index=df.index, copy=False)}
+
+    # Keep the remaining columns under descriptive names, dropping the date parts
+    for name in df.columns:
+        if name not in ('YEAR', 'MO', 'DY'):
+            columns[POWER_COLUMN_NAMES.get(name, name)] = df[name]
+
+    harmonized = pd.DataFrame(columns, copy=False)
     print("Data harmonization complete.")
-    return df
+    return harmonized
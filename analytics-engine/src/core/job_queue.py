@@ -0,0 +1,499 @@
+"""
+Background job queue for large batch, calendar and regional analyses.
+
+Large analyses can outlast HTTP timeouts, so they are persisted to a local
+SQLite database and processed by a small pool of worker threads. Submitting a
+job returns its ID immediately; progress and partial results can be polled or
+streamed while the job runs, and finished jobs are purged once their results
+expire. The worker pool is separate from the request handlers, so interactive
+/analyze traffic never queues behind bulk work.
+
+Several processes may share one database. A running job is leased by the
+process running it, which renews the lease while it works; a job whose lease
+has expired, because its process died, is claimed again by any worker and
+resumes after the results already recorded.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterator
+
+from config.settings import settings
+from .weather_service import get_weather_analysis
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATUSES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+JOB_KINDS = ("batch", "calendar", "region")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    params TEXT NOT NULL,
+    total_items INTEGER NOT NULL,
+    completed_items INTEGER NOT NULL DEFAULT 0,
+    failed_items INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    expires_at REAL,
+    lease_owner TEXT,
+    lease_expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_pending ON jobs (status, priority, created_at);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+# Columns added after the first release, created on databases that lack them
+_LEASE_COLUMNS = {"lease_owner": "TEXT", "lease_expires_at": "REAL"}
+
+
+def expand_job_items(kind: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Expands a job's parameters into the list of individual analyses it covers.
+
+    Args:
+        kind: The job kind ("batch", "calendar" or "region").
+        params: The job parameters as submitted.
+
+    Returns:
+        A list of items, each with "latitude", "longitude" and "target_date" keys.
+
+    Raises:
+        ValueError: If the parameters are invalid or expand to too many items.
+    """
+    if kind == "batch":
+        items = [
+            {
+                "latitude": item["latitude"],
+                "longitude": item["longitude"],
+                "target_date": item["target_date"]
+            }
+            for item in params["items"]
+        ]
+
+    elif kind == "calendar":
+        start = datetime.strptime(params["start_date"], '%Y-%m-%d')
+        end = datetime.strptime(params["end_date"], '%Y-%m-%d')
+        if end < start:
+            raise ValueError("end_date must not be before start_date.")
+        if (end - start).days + 1 > settings.JOB_MAX_ITEMS:
+            raise ValueError(f"Job exceeds the limit of {settings.JOB_MAX_ITEMS} analyses.")
+        items = [
+            {
+                "latitude": params["latitude"],
+                "longitude": params["longitude"],
+                "target_date": (start + timedelta(days=offset)).strftime('%Y-%m-%d')
+            }
+            for offset in range((end - start).days + 1)
+        ]
+
+    elif kind == "region":
+        step = params.get("step_degrees") or settings.REGION_GRID_STEP_DEGREES
+        if params["lat_max"] < params["lat_min"] or params["lon_max"] < params["lon_min"]:
+            raise ValueError("Region bounds are inverted.")
+        # The epsilon keeps a bound that is a whole number of steps away,
+        # e.g. 0.3 with a 0.1 step, from being lost to floating-point error.
+        lat_count = math.floor((params["lat_max"] - params["lat_min"]) / step + 1e-9) + 1
+        lon_count = math.floor((params["lon_max"] - params["lon_min"]) / step + 1e-9) + 1
+        if lat_count * lon_count > settings.JOB_MAX_ITEMS:
+            raise ValueError(f"Region expands to more than {settings.JOB_MAX_ITEMS} analyses.")
+        items = [
+            {
+                "latitude": round(params["lat_min"] + i * step, 4),
+                "longitude": round(params["lon_min"] + j * step, 4),
+                "target_date": params["target_date"]
+            }
+            for i in range(lat_count)
+            for j in range(lon_count)
+        ]
+
+    else:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    if not items:
+        raise ValueError("Job contains no analyses.")
+    if len(items) > settings.JOB_MAX_ITEMS:
+        raise ValueError(f"Job exceeds the limit of {settings.JOB_MAX_ITEMS} analyses.")
+
+    for item in items:
+        datetime.strptime(item["target_date"], '%Y-%m-%d')
+
+    return items
+
+
+class JobQueue:
+    """SQLite-backed priority queue with a pool of analysis worker threads."""
+
+    def __init__(self, db_path: str, max_workers: int, result_ttl_seconds: int,
+                 sweep_interval_seconds: int, lease_seconds: int):
+        """Initialize the queue; workers are started by start()."""
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.result_ttl_seconds = result_ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.lease_seconds = lease_seconds
+
+        # Identifies this queue's leases among the processes sharing the database
+        self.owner_id = uuid.uuid4().hex
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._workers: List[threading.Thread] = []
+        self._heartbeat: Optional[threading.Thread] = None
+        self._last_sweep = 0.0
+
+    # --- Lifecycle ---
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema if needed."""
+        with self._lock:
+            if self._conn is None:
+                directory = os.path.dirname(self.db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.row_factory = sqlite3.Row
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                existing = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+                for name, column_type in _LEASE_COLUMNS.items():
+                    if name not in existing:
+                        conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {column_type}")
+                self._conn = conn
+            return self._conn
+
+    def start(self):
+        """
+        Start the worker threads and the lease heartbeat.
+
+        Jobs interrupted by a restart are not reset here, since another live
+        process may be running them; they are claimed again once their lease
+        expires.
+        """
+        if self._workers:
+            return
+
+        self._connect()
+        self._stopping.clear()
+        for index in range(self.max_workers):
+            worker = threading.Thread(
+                target=self._worker_loop, name=f"job-worker-{index}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+        self._heartbeat = threading.Thread(
+            target=self._heartbeat_loop, name="job-heartbeat", daemon=True
+        )
+        self._heartbeat.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Signal the workers to stop, wait briefly, and release this process's leases."""
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+        if self._heartbeat is not None:
+            self._heartbeat.join(timeout)
+            self._heartbeat = None
+
+        # Hand unfinished jobs back to the queue so another process can resume
+        # them without waiting for the lease to expire.
+        conn = self._connect()
+        with self._lock, conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires_at = NULL "
+                "WHERE status = ? AND lease_owner = ?",
+                (JOB_QUEUED, JOB_RUNNING, self.owner_id)
+            )
+
+    # --- Public API ---
+
+    def submit(self, kind: str, params: Dict[str, Any], priority: int = 5) -> Dict[str, Any]:
+        """
+        Persist a new job and wake a worker to process it.
+
+        Args:
+            kind: The job kind ("batch", "calendar" or "region").
+            params: The job parameters.
+            priority: Scheduling priority; lower values run first.
+
+        Returns:
+            The newly created job record.
+
+        Raises:
+            ValueError: If the job parameters are invalid.
+        """
+        items = expand_job_items(kind, params)
+        job_id = uuid.uuid4().hex
+        now = time.time()
+
+        conn = self._connect()
+        with self._lock, conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, priority, params, total_items, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, JOB_QUEUED, priority, json.dumps(params), len(items), now)
+            )
+
+        with self._wakeup:
+            self._wakeup.notify()
+
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job record, or None if it does not exist or has expired."""
+        conn = self._connect()
+        with self._lock:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE id = ? AND (expires_at IS NULL OR expires_at >= ?)",
+                (job_id, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        return job
+
+    def get_results(self, job_id: str, offset: int = 0, limit: int = -1) -> List[Dict[str, Any]]:
+        """
+        Return the results recorded so far, in completion order.
+
+        Each result carries the "seq" index of the item it belongs to, since
+        items are processed grouped by location rather than in submission order.
+        """
+        conn = self._connect()
+        with self._lock:
+            rows = conn.execute(
+                "SELECT payload FROM job_results WHERE job_id = ? "
+                "ORDER BY rowid LIMIT ? OFFSET ?",
+                (job_id, limit, offset)
+            ).fetchall()
+        return [json.loads(row["payload"]) for row in rows]
+
+    def iter_results(self, job_id: str, offset: int = 0, follow: bool = False,
+                     poll_interval: float = 0.5) -> Iterator[Dict[str, Any]]:
+        """
+        Yield results as they become available.
+
+        Args:
+            job_id: The job to read.
+            offset: The number of already-received results to skip.
+            follow: Keep waiting for new results until the job finishes.
+            poll_interval: Seconds between polls while following.
+        """
+        position = offset
+        while True:
+            job = self.get_job(job_id)
+            if job is None:
+                return
+
+            # The status is read before the results, so a finished job's
+            # results are always complete by the time they are read here.
+            for result in self.get_results(job_id, position):
+                position += 1
+                yield result
+
+            if not follow or job["status"] in FINISHED_STATUSES:
+                return
+
+            time.sleep(poll_interval)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job. Returns False if it already finished."""
+        now = time.time()
+        conn = self._connect()
+        with self._lock, conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, expires_at = ? "
+                "WHERE id = ? AND status IN (?, ?)",
+                (JOB_CANCELLED, now, now + self.result_ttl_seconds,
+                 job_id, JOB_QUEUED, JOB_RUNNING)
+            )
+        return cursor.rowcount > 0
+
+    def purge_expired(self) -> int:
+        """Delete finished jobs whose results have expired. Returns the number purged."""
+        now = time.time()
+        conn = self._connect()
+        with self._lock, conn:
+            expired = [
+                row["id"] for row in conn.execute(
+                    "SELECT id FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)
+                )
+            ]
+            for job_id in expired:
+                conn.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+                conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        self._last_sweep = now
+        return len(expired)
+
+    # --- Workers ---
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        """
+        Lease the highest-priority claimable job and return it.
+
+        A job is claimable if it is queued, or running under a lease that has
+        expired. The claim is a conditional update, so when several processes
+        race for the same job only one of them gets it.
+        """
+        conn = self._connect()
+        while True:
+            now = time.time()
+            with self._lock, conn:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? OR (status = ? AND "
+                    "(lease_expires_at IS NULL OR lease_expires_at < ?)) "
+                    "ORDER BY priority, created_at LIMIT 1",
+                    (JOB_QUEUED, JOB_RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    return None
+                cursor = conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = COALESCE(started_at, ?), "
+                    "lease_owner = ?, lease_expires_at = ? "
+                    "WHERE id = ? AND (status = ? OR (status = ? AND "
+                    "(lease_expires_at IS NULL OR lease_expires_at < ?)))",
+                    (JOB_RUNNING, now, self.owner_id, now + self.lease_seconds,
+                     row["id"], JOB_QUEUED, JOB_RUNNING, now)
+                )
+            if cursor.rowcount == 1:
+                return self.get_job(row["id"])
+            # Another process claimed it between the select and the update.
+
+    def _renew_leases(self) -> int:
+        """Extend the leases of the jobs this process is running. Returns the number renewed."""
+        conn = self._connect()
+        with self._lock, conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE status = ? AND lease_owner = ?",
+                (time.time() + self.lease_seconds, JOB_RUNNING, self.owner_id)
+            )
+        return cursor.rowcount
+
+    def _heartbeat_loop(self):
+        """Renew this process's leases well before they expire, until stopped."""
+        while not self._stopping.wait(self.lease_seconds / 3):
+            try:
+                self._renew_leases()
+            except sqlite3.Error as e:
+                print(f"Could not renew job leases: {e}")
+
+    def _worker_loop(self):
+        """Process jobs until the queue is stopped."""
+        while not self._stopping.is_set():
+            if time.time() - self._last_sweep >= self.sweep_interval_seconds:
+                purged = self.purge_expired()
+                if purged:
+                    print(f"Purged {purged} expired job(s).")
+
+            job = self._claim_next()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(timeout=self.sweep_interval_seconds)
+                continue
+
+            try:
+                self._run_job(job)
+            except Exception as e:
+                print(f"Job {job['id']} failed: {e}")
+                self._finish_job(job["id"], JOB_FAILED, error=str(e))
+
+    def _is_cancelled(self, job_id: str) -> bool:
+        """Return True if the job was cancelled, purged or claimed by another process."""
+        job = self.get_job(job_id)
+        return (job is None or job["status"] == JOB_CANCELLED
+                or job["lease_owner"] != self.owner_id)
+
+    def _record_result(self, job_id: str, seq: int, item: Dict[str, Any],
+                       result: Dict[str, Any]):
+        """Store one item's result and advance the job's progress counters."""
+        failed = 1 if "error" in result else 0
+        payload = json.dumps({"seq": seq, "item": item, "result": result}, default=float)
+        conn = self._connect()
+        with self._lock, conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO job_results (job_id, seq, payload) VALUES (?, ?, ?)",
+                (job_id, seq, payload)
+            )
+            # An item already recorded, e.g. by a process whose lease expired,
+            # must not be counted twice.
+            if cursor.rowcount == 1:
+                conn.execute(
+                    "UPDATE jobs SET completed_items = completed_items + 1, "
+                    "failed_items = failed_items + ? WHERE id = ?",
+                    (failed, job_id)
+                )
+
+    def _finish_job(self, job_id: str, status: str, error: Optional[str] = None):
+        """Mark a running job as finished and schedule its results for expiry."""
+        now = time.time()
+        conn = self._connect()
+        with self._lock, conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, expires_at = ?, "
+                "lease_owner = NULL, lease_expires_at = NULL "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (status, error, now, now + self.result_ttl_seconds, job_id, JOB_RUNNING,
+                 self.owner_id)
+            )
+
+    def _run_job(self, job: Dict[str, Any]):
+        """Run every analysis in the job, resuming after any results already recorded."""
+        job_id = job["id"]
+        items = expand_job_items(job["kind"], job["params"])
+        done = {result["seq"] for result in self.get_results(job_id)}
+
+        # Process items grouped by location so each location is loaded once.
+        locations: Dict[tuple, List[int]] = {}
+        for seq, item in enumerate(items):
+            if seq not in done:
+                locations.setdefault((item["latitude"], item["longitude"]), []).append(seq)
+
+        for (latitude, longitude), seqs in locations.items():
+            for seq in seqs:
+                # Checked per item: a calendar job has a single location.
+                if self._stopping.is_set() or self._is_cancelled(job_id):
+                    return
+                result = get_weather_analysis(
+                    latitude, longitude, items[seq]["target_date"], bulk=True
+                )
+                self._record_result(job_id, seq, items[seq], result)
+
+        self._finish_job(job_id, JOB_COMPLETED)
+
+
+# Global job queue instance
+job_queue = JobQueue(
+    db_path=settings.JOB_DB_PATH,
+    max_workers=settings.JOB_MAX_WORKERS,
+    result_ttl_seconds=settings.JOB_RESULT_TTL_SECONDS,
+    sweep_interval_seconds=settings.JOB_SWEEP_INTERVAL_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS
+)
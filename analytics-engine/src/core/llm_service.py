@@ -6,9 +6,13 @@ Google's Gemini AI model to generate more detailed and contextual insights.
 """
 
 import json
-import google.generativeai as genai
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Optional
 from config.settings import settings
+from ..lazy_imports import lazy_import
+from .upstream_recorder import upstream_recorder
+
+genai = lazy_import("google.generativeai")
 
 
 class LLMService:
@@ -61,6 +65,8 @@ JSON
   }
 }
 
+Any of the temperature, precipitation, wind and humidity sections may be absent if the user did not request it, and other sections (such as solar, cloud_cover or snow) may be present.
+
 Step 2: Adhere to the Required Output Structure
 Your response MUST be a single, raw JSON object that strictly conforms to the following TypeScript interface. Do not add, remove, or rename any keys unless explicitly instructed.
 TypeScript
@@ -129,6 +135,8 @@ Step 3: Follow These Generation Rules Precisely
 
         humidity.average: Map from analysis_result.humidity.average_percent.
 
+        If a temperature, precipitation, wind or humidity section is absent from analysis_result, set the matching weather_conditions key to null instead of inventing values. Do not add keys for other sections; they are returned to the user separately, but you may use them in the score, recommendations and risk factors.
+
     recommendations (string array): Generate 2-4 brief, positive, and actionable recommendations based on the most favorable conditions in analysis_json.analysis_result.
 
     risk_factors (string array): Generate 1-3 brief, cautious warnings based on the least favorable or most variable conditions in analysis_json.analysis_result.
@@ -244,6 +252,10 @@ Here is the analysis_json to process:
             Exception: If LLM processing fails
         """
         try:
+            # Serve recorded enhancements instead of calling Gemini when replaying
+            if upstream_recorder.replaying:
+                return upstream_recorder.replay_llm(analysis_data)
+
             # Initialize the model if not already done
             self._initialize_model()
             
@@ -259,6 +271,9 @@ Here is the analysis_json to process:
             
             # Parse the response as JSON
             enhanced_result = json.loads(response.text.strip())
+
+            if upstream_recorder.recording:
+                upstream_recorder.record_llm(analysis_data, enhanced_result)
             
             return enhanced_result
             
@@ -268,5 +283,16 @@ Here is the analysis_json to process:
             raise Exception(f"LLM processing failed: {str(e)}")
 
 
-# Global LLM service instance
-llm_service = LLMService()
+# Global LLM service instance, created on first use
+_llm_service: Optional[LLMService] = None
+_llm_service_lock = threading.Lock()
+
+
+def get_llm_service() -> LLMService:
+    """Return the shared LLM service, creating it on first use."""
+    global _llm_service
+    if _llm_service is None:
+        with _llm_service_lock:
+            if _llm_service is None:
+                _llm_service = LLMService()
+    return _llm_service
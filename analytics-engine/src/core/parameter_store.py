@@ -0,0 +1,190 @@
+"""
+Per-parameter storage for NASA POWER historical data.
+
+Each grid cell's data is stored as one column file per POWER parameter plus a
+shared date index, so adding a parameter only requires fetching that parameter
+and analyses only load the columns they use. Columns are kept on disk in the
+compressed column_codec format and decoded into a bounded in-memory LRU.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.settings import settings
+from ..lazy_imports import lazy_import
+from .cache import LRUCache
+from .column_codec import decode_column, encode_column
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+Cell = Tuple[float, float]
+
+_DATES_FILE = "dates"
+
+
+def split_raw_data(raw_data: pd.DataFrame, parameters: Iterable[str]
+                   ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Splits a DataFrame returned by fetch_historical_data into storable columns.
+
+    Args:
+        raw_data: The fetched DataFrame with YEAR, MO and DY columns.
+        parameters: The POWER parameters to extract; absent ones are skipped.
+
+    Returns:
+        A (dates, columns) tuple of YYYYMMDD integers and parameter values.
+    """
+    dates = (raw_data['YEAR'] * 10000 + raw_data['MO'] * 100 + raw_data['DY']).to_numpy()
+    columns = {
+        parameter: raw_data[parameter].to_numpy()
+        for parameter in parameters if parameter in raw_data.columns
+    }
+    return dates, columns
+
+
+def assemble_raw_data(dates: np.ndarray, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Rebuild the DataFrame layout returned by fetch_historical_data from stored columns."""
+    frame = {
+        'YEAR': dates // 10000,
+        'MO': dates // 100 % 100,
+        'DY': dates % 100
+    }
+    frame.update(columns)
+    # Wrap the stored arrays instead of consolidating them into a new block.
+    return pd.DataFrame(frame, copy=False)
+
+
+class ParameterStore:
+    """Disk-backed store of historical series keyed by (grid cell, parameter)."""
+
+    def __init__(self, directory: str, max_columns_in_memory: int):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Root directory for column files.
+            max_columns_in_memory: Number of (cell, parameter) columns kept in memory.
+        """
+        self.directory = directory
+        self._memory = LRUCache(max_entries=max_columns_in_memory)
+        self._write_lock = threading.Lock()
+
+    def _cell_dir(self, cell: Cell) -> str:
+        # The configured date range is part of the path, so changing it never
+        # mixes series of different lengths.
+        date_range = f"{settings.NASA_POWER_START_DATE}-{settings.NASA_POWER_END_DATE}"
+        return os.path.join(self.directory, date_range, f"{cell[0]:.4f}_{cell[1]:.4f}")
+
+    def _column_path(self, cell: Cell, name: str) -> str:
+        return os.path.join(self._cell_dir(cell), f"{name}.col")
+
+    def _read_column(self, cell: Cell, name: str) -> Optional[np.ndarray]:
+        """Return a column from memory or disk, or None if it is not stored."""
+        column = self._memory.get((cell, name))
+        if column is not None:
+            return column
+
+        path = self._column_path(cell, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as handle:
+            column = decode_column(handle.read())
+        if name == _DATES_FILE:
+            column = column.astype(np.int32)
+        column.setflags(write=False)
+        self._memory.put((cell, name), column)
+        return column
+
+    def _write_column(self, cell: Cell, name: str, column: np.ndarray):
+        """Atomically write a column to disk and remember it in memory."""
+        path = self._column_path(cell, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as handle:
+            handle.write(encode_column(column))
+        os.replace(temp_path, path)
+        column.setflags(write=False)
+        self._memory.put((cell, name), column)
+
+    def has_column(self, cell: Cell, name: str) -> bool:
+        """Return True if the column is stored, without loading it."""
+        return (cell, name) in self._memory or os.path.exists(self._column_path(cell, name))
+
+    def missing_parameters(self, cell: Cell, parameters: Iterable[str]) -> List[str]:
+        """Return the parameters that are not yet stored for a cell."""
+        return [name for name in parameters if not self.has_column(cell, name)]
+
+    def cells(self) -> List[Cell]:
+        """Return every cell with data stored on disk for the configured date range."""
+        root = os.path.dirname(self._cell_dir((0.0, 0.0)))
+        if not os.path.isdir(root):
+            return []
+        cells = []
+        for name in sorted(os.listdir(root)):
+            latitude, _, longitude = name.partition("_")
+            cells.append((float(latitude), float(longitude)))
+        return cells
+
+    def load(self, cell: Cell, parameters: Iterable[str]
+             ) -> Tuple[Optional[np.ndarray], Dict[str, np.ndarray]]:
+        """
+        Loads stored columns for a cell.
+
+        Args:
+            cell: The grid cell.
+            parameters: The POWER parameters to load.
+
+        Returns:
+            A (dates, columns) tuple where dates holds YYYYMMDD integers (or None
+            if nothing is stored) and columns maps each stored parameter to its
+            values aligned with dates. Missing parameters are omitted.
+        """
+        dates = self._read_column(cell, _DATES_FILE)
+        if dates is None:
+            return None, {}
+        columns = {}
+        for name in parameters:
+            column = self._read_column(cell, name)
+            if column is not None:
+                columns[name] = column
+        return dates, columns
+
+    def save(self, cell: Cell, dates: np.ndarray, columns: Dict[str, np.ndarray]):
+        """
+        Stores newly fetched columns for a cell.
+
+        Args:
+            cell: The grid cell.
+            dates: YYYYMMDD integers for the rows of the new columns.
+            columns: Parameter values aligned with dates.
+        """
+        with self._write_lock:
+            stored_dates = self._read_column(cell, _DATES_FILE)
+            if stored_dates is None:
+                stored_dates = np.asarray(dates, dtype=np.int32)
+                self._write_column(cell, _DATES_FILE, stored_dates)
+
+            aligned = np.array_equal(stored_dates, dates)
+            if not aligned:
+                positions = np.searchsorted(dates, stored_dates)
+                positions = np.clip(positions, 0, len(dates) - 1)
+                found = dates[positions] == stored_dates
+
+            for name, values in columns.items():
+                values = np.asarray(values, dtype=np.float64)
+                if not aligned:
+                    # Align a series with a different date coverage onto the stored index.
+                    values = np.where(found, values[positions], np.nan)
+                self._write_column(cell, name, values)
+
+
+# Global parameter store instance
+parameter_store = ParameterStore(
+    directory=settings.DATA_CACHE_DIR,
+    max_columns_in_memory=settings.DATA_CACHE_MAX_COLUMNS
+)
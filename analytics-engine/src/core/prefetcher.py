@@ -0,0 +1,318 @@
+"""
+Predictive prefetch of frequently requested grid cells.
+
+Traffic is concentrated on a few hundred locations, yet after a restart or
+an eviction the first request for each cell pays for the full NASA POWER
+download. Every analysis request is therefore counted per grid cell in a
+count-min sketch whose counts decay exponentially, so the ranking follows
+shifts in demand. The sketch and its most frequent cells are saved to disk.
+During warm-up the most requested cells stored on disk are loaded into the
+cache; after that, a background thread periodically loads the top cells
+through the normal fetch pipeline. Each round has a fetch and time budget,
+fetches are made as bulk work that yields to live requests, and the round
+pauses whenever interactive requests are waiting for a fetch slot.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from ..lazy_imports import lazy_import
+from .admission import AdmissionRejected, admission_controller
+from .cache import grid_cell
+from .weather_service import is_cached, is_loaded, load_year_matrix
+
+np = lazy_import("numpy")
+
+
+Cell = Tuple[float, float]
+
+
+class CountMinSketch:
+    """Count-min sketch of request counts with exponential time decay."""
+
+    def __init__(self, width: int, depth: int, half_life_seconds: float):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            width: Counters per row; more counters mean fewer overestimates.
+            depth: Number of independently hashed rows.
+            half_life_seconds: Time for every count to decay by half.
+        """
+        self.width = width
+        self.depth = depth
+        self.half_life_seconds = half_life_seconds
+        self.counters = np.zeros((depth, width))
+        self.decayed_at = time.time()
+        self._rows = np.arange(depth)
+
+    def _columns(self, key: Cell) -> np.ndarray:
+        digest = hashlib.blake2b(f"{key[0]:.4f},{key[1]:.4f}".encode(), digest_size=4 * self.depth).digest()
+        return np.frombuffer(digest, dtype=np.uint32) % self.width
+
+    def add(self, key: Cell, count: float = 1.0) -> float:
+        """Count a key and return its new estimate."""
+        columns = self._columns(key)
+        self.counters[self._rows, columns] += count
+        return float(self.counters[self._rows, columns].min())
+
+    def estimate(self, key: Cell) -> float:
+        """Return an upper bound on the key's decayed count."""
+        return float(self.counters[self._rows, self._columns(key)].min())
+
+    def decay(self, now: Optional[float] = None):
+        """Apply the decay for the time elapsed since the last call."""
+        now = time.time() if now is None else now
+        elapsed = now - self.decayed_at
+        if elapsed > 0:
+            self.counters *= 0.5 ** (elapsed / self.half_life_seconds)
+            self.decayed_at = now
+
+
+class Prefetcher:
+    """Tracks per-cell demand and warms the most requested cells in the background."""
+
+    def __init__(self, sketch_path: str, top_k: int, min_requests: float,
+                 interval_seconds: int, max_fetches_per_round: int, round_seconds: int):
+        """
+        Initialize the prefetcher; the background thread is started by start().
+
+        Args:
+            sketch_path: File the sketch is persisted to.
+            top_k: Number of most requested cells kept warm.
+            min_requests: Smallest decayed request count worth prefetching.
+            interval_seconds: Time between prefetch rounds.
+            max_fetches_per_round: Upstream fetches allowed per round.
+            round_seconds: Wall-clock budget per round.
+        """
+        self.sketch_path = sketch_path
+        self.top_k = top_k
+        self.min_requests = min_requests
+        self.interval_seconds = interval_seconds
+        self.max_fetches_per_round = max_fetches_per_round
+        self.round_seconds = round_seconds
+
+        self._sketch: Optional[CountMinSketch] = None
+        # Cells that may be among the most requested, with their last estimate
+        self._candidates: Dict[Cell, float] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Set once the persisted sketch has been read, so an early shutdown
+        # cannot overwrite it with only the requests counted since startup
+        self._loaded = False
+        self.last_round: Dict[str, Any] = {}
+
+    def _new_sketch(self) -> CountMinSketch:
+        return CountMinSketch(
+            width=settings.PREFETCH_SKETCH_WIDTH,
+            depth=settings.PREFETCH_SKETCH_DEPTH,
+            half_life_seconds=settings.PREFETCH_DECAY_HALF_LIFE_HOURS * 3600
+        )
+
+    def _get_sketch(self) -> CountMinSketch:
+        # Created lazily so importing this module does not load numpy.
+        if self._sketch is None:
+            self._sketch = self._new_sketch()
+        return self._sketch
+
+    # --- Recording ---
+
+    def record(self, latitude: float, longitude: float):
+        """Count a request for the grid cell containing a location."""
+        cell = grid_cell(latitude, longitude)
+        with self._lock:
+            estimate = self._get_sketch().add(cell)
+            self._candidates[cell] = estimate
+            if len(self._candidates) > self.top_k * 4:
+                # Keep the candidate set bounded by dropping the least requested.
+                coldest = min(self._candidates, key=self._candidates.get)
+                del self._candidates[coldest]
+
+    def top_cells(self, limit: Optional[int] = None) -> List[Tuple[Cell, float]]:
+        """
+        Returns the most requested cells.
+
+        Args:
+            limit: Maximum number of cells, or None for top_k.
+
+        Returns:
+            (cell, decayed request count) tuples, most requested first, for the
+            cells at or above min_requests.
+        """
+        with self._lock:
+            sketch = self._get_sketch()
+            sketch.decay()
+            for cell in self._candidates:
+                self._candidates[cell] = sketch.estimate(cell)
+            ranked = sorted(self._candidates.items(), key=lambda item: item[1], reverse=True)
+        return [item for item in ranked if item[1] >= self.min_requests][:limit or self.top_k]
+
+    # --- Persistence ---
+
+    def load(self):
+        """Load the persisted sketch, decaying it for the time the service was down."""
+        self._loaded = True
+        try:
+            with np.load(self.sketch_path) as saved:
+                sketch = self._new_sketch()
+                if saved["counters"].shape != sketch.counters.shape:
+                    print("Prefetch sketch dimensions changed; starting with an empty sketch.")
+                    return
+                sketch.counters = saved["counters"].copy()
+                sketch.decayed_at = float(saved["decayed_at"])
+                candidates = [tuple(cell) for cell in saved["candidates"].tolist()]
+        except FileNotFoundError:
+            return
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Could not load prefetch sketch: {e}")
+            return
+        sketch.decay()
+        with self._lock:
+            # Keep the requests counted since startup, before the sketch was loaded.
+            if self._sketch is not None:
+                self._sketch.decay()
+                sketch.counters += self._sketch.counters
+                candidates += list(self._candidates)
+            self._sketch = sketch
+            estimates = sorted(((cell, sketch.estimate(cell)) for cell in set(candidates)),
+                               key=lambda item: item[1], reverse=True)
+            self._candidates = dict(estimates[:self.top_k * 4])
+
+    def save(self):
+        """Atomically write the sketch and its candidate cells to disk."""
+        with self._lock:
+            if self._sketch is None or not self._loaded:
+                return
+            counters = self._sketch.counters.copy()
+            decayed_at = self._sketch.decayed_at
+            candidates = np.array(list(self._candidates), dtype=np.float64).reshape(-1, 2)
+
+        directory = os.path.dirname(self.sketch_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.sketch_path}.tmp"
+        with open(temp_path, "wb") as handle:
+            np.savez(handle, counters=counters, decayed_at=decayed_at, candidates=candidates)
+        os.replace(temp_path, self.sketch_path)
+
+    # --- Warming ---
+
+    def preload(self, limit: int) -> int:
+        """
+        Loads the most requested cells that are stored on disk into memory.
+
+        Used during warm-up, so cells that would need an upstream fetch are
+        left to the background rounds.
+
+        Args:
+            limit: Maximum number of cells to preload.
+
+        Returns:
+            The number of cells preloaded.
+        """
+        loaded = 0
+        for cell, _ in self.top_cells(limit):
+            if is_cached(*cell) and load_year_matrix(*cell) is not None:
+                loaded += 1
+        return loaded
+
+    def _wait_for_spare_capacity(self, deadline: float) -> bool:
+        """Wait until live traffic leaves a fetch slot free; False if the round must end."""
+        while not admission_controller.has_spare_fetch_capacity():
+            if time.monotonic() >= deadline or self._stopping.wait(1.0):
+                return False
+        return not self._stopping.is_set()
+
+    def run_round(self) -> Dict[str, Any]:
+        """
+        Warms the most requested cells that are not already in memory.
+
+        Cells stored on disk are loaded without an upstream fetch; the others
+        are fetched, up to max_fetches_per_round, as bulk work. The round ends
+        when round_seconds have passed or the prefetcher is stopped, including
+        while it is waiting for a fetch slot.
+
+        Returns:
+            Counts of cells that were already warm, loaded, fetched, skipped
+            and failed in this round.
+        """
+        deadline = time.monotonic() + self.round_seconds
+        summary = {"warm": 0, "loaded": 0, "fetched": 0, "skipped": 0, "failed": 0}
+        for cell, _ in self.top_cells():
+            if is_loaded(*cell):
+                summary["warm"] += 1
+                continue
+            needs_fetch = not is_cached(*cell)
+            if (needs_fetch and summary["fetched"] >= self.max_fetches_per_round) \
+                    or not self._wait_for_spare_capacity(deadline):
+                summary["skipped"] += 1
+                continue
+            try:
+                with admission_controller.bulk_wait_limit(deadline, self._stopping):
+                    loaded = load_year_matrix(*cell, bulk=True) is not None
+            except AdmissionRejected:
+                # Out of time, or stopping; the remaining cells wait for the next round.
+                summary["skipped"] += 1
+                break
+            if not loaded:
+                summary["failed"] += 1
+            elif needs_fetch:
+                summary["fetched"] += 1
+            else:
+                summary["loaded"] += 1
+        return summary
+
+    def _run(self):
+        """Run prefetch rounds until stopped."""
+        while not self._stopping.is_set():
+            start = time.time()
+            try:
+                summary = self.run_round()
+                self.save()
+                self.last_round = {**summary, "finished_at": time.time(),
+                                   "seconds": round(time.time() - start, 2)}
+                if summary["loaded"] or summary["fetched"]:
+                    print(f"Prefetch round: {summary}")
+            except Exception as e:
+                print(f"Prefetch round failed: {e}")
+            self._stopping.wait(self.interval_seconds)
+
+    def start(self):
+        """Start the background prefetch thread; called once warm-up has loaded the sketch."""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="prefetcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the background thread and persist the sketch."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.save()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of tracked cells and the last round's summary."""
+        with self._lock:
+            tracked = len(self._candidates)
+        return {"tracked_cells": tracked, "last_round": self.last_round}
+
+
+# Global prefetcher instance
+prefetcher = Prefetcher(
+    sketch_path=settings.PREFETCH_SKETCH_PATH,
+    top_k=settings.PREFETCH_TOP_K,
+    min_requests=settings.PREFETCH_MIN_REQUESTS,
+    interval_seconds=settings.PREFETCH_INTERVAL_SECONDS,
+    max_fetches_per_round=settings.PREFETCH_MAX_FETCHES_PER_ROUND,
+    round_seconds=settings.PREFETCH_ROUND_SECONDS
+)
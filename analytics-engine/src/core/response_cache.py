@@ -0,0 +1,126 @@
+"""
+Full-response caching for weather analysis results.
+
+The statistics in an analysis are a pure function of the grid cell, the
+day-of-year window, the requested year range and the dataset version, and the enhanced result further
+depends only on the user's activity. Serialized responses are therefore cached
+under that key together with a strong ETag, so repeat requests skip the whole
+pipeline and conditional requests can be answered with 304 Not Modified.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from .cache import LRUCache, grid_cell
+from .weather_analyzer import analysis_window
+
+
+# Response modes: "llm" results are AI-enhanced, "basic" results are the
+# non-LLM fallback served when the LLM budget is exhausted.
+MODE_LLM = "llm"
+MODE_BASIC = "basic"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A serialized response body with its validator and caching policy."""
+    body: bytes
+    etag: str
+    cache_control: str
+
+
+def dataset_version() -> str:
+    """Return an identifier that changes whenever the underlying dataset does."""
+    return "|".join([
+        settings.DATASET_VERSION,
+        settings.NASA_POWER_COMMUNITY,
+        settings.NASA_POWER_START_DATE,
+        settings.NASA_POWER_END_DATE
+    ])
+
+
+def response_cache_key(latitude: float, longitude: float, target_date_str: str,
+                       user_activity: str, user_activity_desc: str, mode: str,
+                       metrics: Optional[List[str]] = None,
+                       year_options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Builds the cache key for an analysis response.
+
+    Args:
+        latitude: The latitude of the location (-90 to 90).
+        longitude: The longitude of the location (-180 to 180).
+        target_date_str: The user's target future date (e.g., "2025-10-08").
+        user_activity: The user's activity type.
+        user_activity_desc: The user's activity description.
+        mode: MODE_LLM or MODE_BASIC.
+        metrics: The requested analysis sections, or None for the defaults.
+        year_options: The requested year range and breakdown options, if any.
+
+    Returns:
+        A hex digest identifying the response.
+    """
+    start_date, end_date = analysis_window(target_date_str)
+    # Both the day-of-year bounds and the calendar labels are part of the
+    # output, and they differ between leap and non-leap target years.
+    window = (
+        start_date.timetuple().tm_yday, end_date.timetuple().tm_yday,
+        start_date.strftime('%m-%d'), end_date.strftime('%m-%d')
+    )
+    key_parts = [
+        grid_cell(latitude, longitude), window, dataset_version(),
+        user_activity, user_activity_desc, mode,
+        sorted(set(metrics)) if metrics else None,
+        sorted(
+            (name, value) for name, value in (year_options or {}).items()
+            if value is not None and value is not False
+        )
+    ]
+    return hashlib.sha256(json.dumps(key_parts).encode("utf-8")).hexdigest()
+
+
+def cache_control_for(mode: str) -> str:
+    """Return the Cache-Control policy for a response mode."""
+    if mode == MODE_BASIC:
+        # Degraded responses should be replaced by enhanced ones soon.
+        return f"public, max-age={settings.RESPONSE_BASIC_MAX_AGE_SECONDS}"
+    return (
+        f"public, max-age={settings.RESPONSE_MAX_AGE_SECONDS}, "
+        f"s-maxage={settings.RESPONSE_SHARED_MAX_AGE_SECONDS}, "
+        f"stale-while-revalidate={settings.RESPONSE_STALE_WHILE_REVALIDATE_SECONDS}"
+    )
+
+
+def build_cached_response(body: bytes, mode: str) -> CachedResponse:
+    """Wrap a serialized body with its strong ETag and caching policy."""
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return CachedResponse(body=body, etag=etag, cache_control=cache_control_for(mode))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluates an If-None-Match header against an ETag.
+
+    If-None-Match uses the weak comparison function, so a W/ prefix on the
+    client's validator is ignored.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+# Global response cache instance
+response_cache = LRUCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,63 @@
+"""
+Per-request timing of analysis pipeline stages.
+
+A request collects the time it spends in each stage (upstream fetch, column
+loading, harmonization, analysis, LLM enhancement) and which stages failed, so
+the API can report the breakdown in a Server-Timing header and load tests can
+attribute latency and errors to individual stages. Timing is a no-op outside a
+collect_stage_timings block.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Set
+
+
+class StageTimings(dict):
+    """Seconds spent in each stage of one request, plus the stages that failed."""
+
+    def __init__(self):
+        super().__init__()
+        self.failed: Set[str] = set()
+
+
+_timings: ContextVar[Optional[StageTimings]] = ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def collect_stage_timings() -> Iterator[StageTimings]:
+    """Record the stages run inside the block into the yielded StageTimings."""
+    timings = StageTimings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Add the time spent inside the block to the named stage of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def mark_failed(name: str):
+    """Record that a stage of the current request failed."""
+    timings = _timings.get()
+    if timings is not None:
+        timings.failed.add(name)
+
+
+def server_timing_header(timings: StageTimings) -> str:
+    """Format stage timings as a Server-Timing header value in milliseconds."""
+    return ", ".join(
+        f"{name};dur={seconds * 1000:.1f}" + (';desc="failed"' if name in timings.failed else "")
+        for name, seconds in timings.items()
+    )
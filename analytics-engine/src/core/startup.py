@@ -0,0 +1,107 @@
+"""
+Startup warm-up and readiness tracking.
+
+The API starts accepting connections before heavy modules are loaded. A
+background warm-up then imports them, loads the prefetcher's request counts
+and preloads the most requested grid cells stored on disk, and only then
+marks the service as ready, so a readiness probe can keep traffic away from
+a cold worker while the liveness probe (/health) already succeeds. The
+prefetcher's background rounds start once the service is ready.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from ..lazy_imports import ensure_loaded, lazy_import, slowest_imports
+from .prefetcher import prefetcher
+
+
+# Modules the request path needs, loaded during warm-up
+WARM_UP_MODULES = ["numpy", "pandas", "requests", "google.generativeai"]
+
+
+class Readiness:
+    """Thread-safe record of the warm-up's progress."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = False
+        self._started_at = time.time()
+        self._phases: Dict[str, float] = {}
+        self._errors: List[str] = []
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return self._ready
+
+    def record_phase(self, name: str, seconds: float):
+        with self._lock:
+            self._phases[name] = round(seconds, 4)
+
+    def record_error(self, message: str):
+        with self._lock:
+            self._errors.append(message)
+
+    def mark_ready(self):
+        with self._lock:
+            self._ready = True
+
+    def report(self) -> Dict[str, Any]:
+        """Return the readiness state, warm-up phase timings and slowest imports."""
+        with self._lock:
+            report = {
+                "ready": self._ready,
+                "uptime_seconds": round(time.time() - self._started_at, 2),
+                "warm_up_seconds": dict(self._phases),
+                "errors": list(self._errors)
+            }
+        report["slowest_imports"] = [
+            {"module": name, "cumulative_ms": round(total * 1000, 1), "self_ms": round(own * 1000, 1)}
+            for name, total, own in slowest_imports(settings.PROFILE_IMPORTS_REPORT_LIMIT)
+        ]
+        return report
+
+
+readiness = Readiness()
+
+
+def warm_up():
+    """Load heavy modules and hot cells, mark the service ready and start prefetching."""
+    start = time.perf_counter()
+    for name in WARM_UP_MODULES:
+        try:
+            ensure_loaded(lazy_import(name))
+        except ImportError as e:
+            readiness.record_error(f"Could not import {name}: {e}")
+    readiness.record_phase("imports", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    try:
+        prefetcher.load()
+        if settings.PRELOAD_HOT_CELLS > 0:
+            loaded = prefetcher.preload(settings.PRELOAD_HOT_CELLS)
+            print(f"Preloaded {loaded} hot cell(s) from disk.")
+    except Exception as e:
+        readiness.record_error(f"Hot cell preload failed: {e}")
+    readiness.record_phase("hot_cells", time.perf_counter() - start)
+
+    readiness.mark_ready()
+    if settings.PREFETCH_ENABLED:
+        prefetcher.start()
+
+    if settings.PROFILE_IMPORTS:
+        print("Slowest imports (cumulative ms / self ms):")
+        for name, total, own in slowest_imports(settings.PROFILE_IMPORTS_REPORT_LIMIT):
+            print(f"  {name:<50} {total * 1000:8.1f} {own * 1000:8.1f}")
+
+
+def start_warm_up() -> Optional[threading.Thread]:
+    """Run warm_up in a background thread unless the service is already ready."""
+    if readiness.ready:
+        return None
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
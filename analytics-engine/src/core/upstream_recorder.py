@@ -0,0 +1,166 @@
+"""
+Record and replay of upstream NASA POWER and Gemini responses.
+
+In record mode, every successful POWER fetch and LLM enhancement is saved
+under UPSTREAM_FIXTURE_DIR as it passes through. In replay mode the upstreams
+are never called: fetches and enhancements are served from those fixtures
+after a synthetic latency, and fail at a configurable rate, so load tests can
+exercise the full request path offline and reproducibly.
+
+POWER fixtures use the parameter store's column format, so a replayed fetch
+can serve any subset of the parameters recorded for a grid cell. LLM fixtures
+are JSON files keyed by a hash of the analysis sent to the model.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from ..lazy_imports import lazy_import
+from .cache import grid_cell
+from .parameter_store import ParameterStore, assemble_raw_data, split_raw_data
+
+pd = lazy_import("pandas")
+
+
+MODE_LIVE = "live"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+
+class ReplayError(Exception):
+    """A synthetic upstream failure injected during replay."""
+
+
+class UpstreamRecorder:
+    """Saves upstream responses as fixtures and serves them back during replay."""
+
+    def __init__(self, mode: str, directory: str, seed: Optional[int] = None):
+        """
+        Initialize the recorder.
+
+        Args:
+            mode: MODE_LIVE, MODE_RECORD or MODE_REPLAY.
+            directory: Root directory for fixture files.
+            seed: Seed for synthetic latency and errors, or None for a random seed.
+
+        Raises:
+            ValueError: If the mode is not recognised.
+        """
+        if mode not in (MODE_LIVE, MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Unknown upstream mode '{mode}'. Use live, record or replay.")
+        self.mode = mode
+        self.directory = directory
+        self.power_fixtures = ParameterStore(os.path.join(directory, "power"), max_columns_in_memory=64)
+        self._llm_directory = os.path.join(directory, "llm")
+        self._llm_fixture_names: Optional[List[str]] = None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == MODE_RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == MODE_REPLAY
+
+    def _simulate(self, latency_ms: float, error_rate: float, upstream: str):
+        """Sleep for a synthetic latency, then fail at the given rate."""
+        with self._lock:
+            # A fixed share of the latency plus an exponential tail with the
+            # same mean, so the configured value is the average.
+            tail = latency_ms * settings.REPLAY_LATENCY_JITTER
+            delay = latency_ms - tail + (self._random.expovariate(1 / tail) if tail > 0 else 0)
+            failed = self._random.random() < error_rate
+        time.sleep(delay / 1000)
+        if failed:
+            raise ReplayError(f"Synthetic {upstream} error injected by replay.")
+
+    def record_power(self, latitude: float, longitude: float, raw_data: pd.DataFrame):
+        """Save the columns of a fetched POWER response for its grid cell."""
+        parameters = [name for name in raw_data.columns if name not in ("YEAR", "MO", "DY")]
+        self.power_fixtures.save(grid_cell(latitude, longitude), *split_raw_data(raw_data, parameters))
+
+    def replay_power(self, latitude: float, longitude: float, parameters: List[str]) -> pd.DataFrame:
+        """
+        Serves a POWER fetch from the recorded fixtures.
+
+        Args:
+            latitude: The requested latitude.
+            longitude: The requested longitude.
+            parameters: The requested POWER parameters.
+
+        Returns:
+            A DataFrame in the fetch_historical_data layout, or an empty DataFrame
+            if the cell or a parameter was never recorded.
+
+        Raises:
+            ReplayError: If a synthetic failure is injected.
+        """
+        self._simulate(settings.REPLAY_POWER_LATENCY_MS, settings.REPLAY_POWER_ERROR_RATE, "NASA POWER")
+        dates, columns = self.power_fixtures.load(grid_cell(latitude, longitude), parameters)
+        if dates is None or len(columns) < len(parameters):
+            print(f"No recorded NASA POWER fixture for ({latitude}, {longitude}) {parameters}.")
+            return pd.DataFrame()
+        return assemble_raw_data(dates, columns)
+
+    def _llm_key(self, analysis_data: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(analysis_data, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def record_llm(self, analysis_data: Dict[str, Any], result: Dict[str, Any]):
+        """Save an LLM enhancement keyed by the analysis it was generated from."""
+        os.makedirs(self._llm_directory, exist_ok=True)
+        path = os.path.join(self._llm_directory, f"{self._llm_key(analysis_data)}.json")
+        with open(path, "w") as handle:
+            json.dump({"analysis_data": analysis_data, "result": result}, handle)
+        with self._lock:
+            self._llm_fixture_names = None
+
+    def replay_llm(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Serves an LLM enhancement from the recorded fixtures.
+
+        Analyses that were not recorded are served a recorded result chosen
+        deterministically by their hash, so a load test with a wider mix of
+        locations and dates than was recorded still exercises the full path.
+
+        Args:
+            analysis_data: The data that would be sent to the model.
+
+        Returns:
+            The recorded enhancement.
+
+        Raises:
+            ReplayError: If a synthetic failure is injected or nothing was recorded.
+        """
+        self._simulate(settings.REPLAY_LLM_LATENCY_MS, settings.REPLAY_LLM_ERROR_RATE, "LLM")
+        key = self._llm_key(analysis_data)
+        path = os.path.join(self._llm_directory, f"{key}.json")
+        if not os.path.exists(path):
+            with self._lock:
+                if self._llm_fixture_names is None:
+                    self._llm_fixture_names = sorted(
+                        name for name in os.listdir(self._llm_directory) if name.endswith(".json")
+                    ) if os.path.isdir(self._llm_directory) else []
+                names = self._llm_fixture_names
+            if not names:
+                raise ReplayError("No recorded LLM fixtures to replay.")
+            path = os.path.join(self._llm_directory, names[int(key, 16) % len(names)])
+        with open(path) as handle:
+            return json.load(handle)["result"]
+
+
+# Global upstream recorder instance
+upstream_recorder = UpstreamRecorder(
+    mode=settings.UPSTREAM_MODE,
+    directory=settings.UPSTREAM_FIXTURE_DIR,
+    seed=settings.REPLAY_SEED
+)
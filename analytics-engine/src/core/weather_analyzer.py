@@ -5,100 +5,306 @@ This module performs statistical analysis on harmonized weather data
 for specific date windows and locations.
 """
 
-import pandas as pd
+from __future__ import annotations
+
 from datetime import datetime, timedelta
-from typing import Dict, Any
-import sys
-import os
+from typing import Dict, Any, List, Optional, Tuple
 
-# Add the project root to the Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from config.settings import settings
+from ..lazy_imports import lazy_import
+from .year_matrix import YearMatrix, resolve_year_range, window_slots
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+# NASA POWER parameters required by each section of the analysis
+METRIC_PARAMETERS = {
+    "temperature": ["T2M", "T2M_MAX", "T2M_MIN"],
+    "precipitation": ["PRECTOTCORR"],
+    "wind": ["WS10M", "WS10M_MAX"],
+    "humidity": ["RH2M"],
+    "solar": ["ALLSKY_SFC_SW_DWN"],
+    "cloud_cover": ["CLOUD_AMT"],
+    "snow": ["SNODP"]
+}
+
+# Sections included when the caller does not ask for specific metrics
+DEFAULT_METRICS = ["temperature", "precipitation", "wind", "humidity"]
+
+# (output key, harmonized column, reduction) for each statistic of each section
+SECTION_STATISTICS = {
+    "temperature": [
+        ("average_c", "Avg_Temperature_C", "mean"),
+        ("range_min_c", "Min_Temperature_C", "mean"),
+        ("range_max_c", "Max_Temperature_C", "mean")
+    ],
+    "precipitation": [
+        ("rain_chance_percent", "Precipitation_mm", "rain_chance"),
+        ("max_daily_mm", "Precipitation_mm", "max")
+    ],
+    "wind": [
+        ("average_kmh", "Wind_Speed_m/s", "mean"),
+        ("max_kmh", "Max_Wind_Speed_m/s", "max")
+    ],
+    "humidity": [("average_percent", "Humidity_Percent", "mean")],
+    "solar": [("average_kwh_m2", "Solar_Radiation_kWh_m2", "mean")],
+    "cloud_cover": [("average_percent", "Cloud_Cover_Percent", "mean")],
+    "snow": [
+        ("average_depth_cm", "Snow_Depth_cm", "mean"),
+        ("max_depth_cm", "Snow_Depth_cm", "max")
+    ]
+}
+
+# Columns converted from m/s to km/h
+_WIND_COLUMNS = ("Wind_Speed_m/s", "Max_Wind_Speed_m/s")
+
+# Fewest years with data for which a trend is reported
+MIN_TREND_YEARS = 3
+
+
+def parameters_for_metrics(metrics: Optional[List[str]] = None) -> List[str]:
+    """
+    Returns the NASA POWER parameters needed to compute the given analysis sections.
+
+    Args:
+        metrics: Analysis section names, or None for DEFAULT_METRICS.
+
+    Returns:
+        The required parameter names, in a stable order.
+
+    Raises:
+        ValueError: If a metric name is not recognised.
+    """
+    metrics = metrics or DEFAULT_METRICS
+    unknown = [metric for metric in metrics if metric not in METRIC_PARAMETERS]
+    if unknown:
+        raise ValueError(
+            f"Unknown metrics: {', '.join(unknown)}. "
+            f"Valid metrics are: {', '.join(METRIC_PARAMETERS)}."
+        )
+    return [
+        parameter
+        for metric in METRIC_PARAMETERS if metric in metrics
+        for parameter in METRIC_PARAMETERS[metric]
+    ]
+
+
+def validate_year_options(start_year: Optional[int] = None, end_year: Optional[int] = None,
+                          recent_years: Optional[int] = None):
+    """
+    Checks that a combination of year-range options is consistent.
+
+    Args:
+        start_year: First year to include, or None.
+        end_year: Last year to include, or None.
+        recent_years: Number of most recent years to include, or None.
+
+    Raises:
+        ValueError: If the options conflict.
+    """
+    if recent_years is not None and start_year is not None:
+        raise ValueError("Use either start_year or recent_years, not both.")
+    if recent_years is not None and recent_years < 1:
+        raise ValueError("recent_years must be at least 1.")
+    if start_year is not None and end_year is not None and start_year > end_year:
+        raise ValueError("start_year must not be after end_year.")
+
+
+def analysis_window(target_date_str: str) -> Tuple[datetime, datetime]:
+    """
+    Returns the first and last dates of the analysis window around a target date.
+
+    Args:
+        target_date_str: The user's target future date (e.g., "2025-10-08").
+
+    Returns:
+        A (start_date, end_date) tuple spanning ANALYSIS_WINDOW_DAYS days.
+    """
+    target_date = datetime.strptime(target_date_str, '%Y-%m-%d')
+    start_date = target_date - timedelta(days=settings.ANALYSIS_WINDOW_HALF)
+    end_date = target_date + timedelta(days=settings.ANALYSIS_WINDOW_HALF)
+    return start_date, end_date
+
+
+def _reduce(values: np.ndarray, present: np.ndarray, reduction: str,
+            axis: Optional[int] = None) -> np.ndarray:
+    """
+    Applies a SECTION_STATISTICS reduction over the days with data.
+
+    Args:
+        values: Window values, NaN for missing days.
+        present: Mask of the days with data.
+        reduction: "mean", "max" or "rain_chance".
+        axis: None to reduce over all years, 1 for one result per year.
+
+    Returns:
+        The reduced value(s); NaN where there are no days with data.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Reduce in place over the mask rather than through NaN-aware
+        # functions, which copy the window first.
+        counts = np.count_nonzero(present, axis=axis)
+        if reduction == "mean":
+            return np.sum(values, axis=axis, where=present) / counts
+        if reduction == "max":
+            result = np.max(values, axis=axis, where=present, initial=-np.inf)
+            return np.where(counts > 0, result, np.nan)
+        rainy = np.count_nonzero(values > settings.PRECIPITATION_THRESHOLD_MM, axis=axis)
+        return rainy / counts * 100
 
 
-def analyze_historical_data(harmonized_df: pd.DataFrame, target_date_str: str) -> Dict[str, Any]:
+def _trend_slopes(years: np.ndarray, series: np.ndarray) -> np.ndarray:
+    """
+    Fits a least-squares line to each row of per-year values.
+
+    Args:
+        years: The window years.
+        series: A (statistics, years) array, NaN for years without data.
+
+    Returns:
+        The slope of each row per decade, NaN where fewer than MIN_TREND_YEARS
+        years have data.
+    """
+    present = ~np.isnan(series)
+    counts = present.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_year = (present * years).sum(axis=1) / counts
+        mean_value = np.where(present, series, 0).sum(axis=1) / counts
+        dx = np.where(present, years - mean_year[:, None], 0)
+        dy = np.where(present, series - mean_value[:, None], 0)
+        slopes = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1) * 10
+    return np.where(counts >= MIN_TREND_YEARS, slopes, np.nan)
+
+
+def _rounded(value: float) -> Optional[float]:
+    """Round a statistic for output, mapping NaN to None."""
+    value = float(value)
+    return None if np.isnan(value) else round(value, settings.DECIMAL_PLACES)
+
+
+def analyze_historical_data(harmonized_df: pd.DataFrame, target_date_str: str,
+                            metrics: Optional[List[str]] = None,
+                            **year_options) -> Dict[str, Any]:
     """
     Analyzes a harmonized historical weather DataFrame for a 31-day window.
 
     Args:
         harmonized_df: DataFrame that has been processed by the harmonize_data function.
         target_date_str: The user's target future date (e.g., "2025-10-08").
+        metrics: Analysis sections to compute (see METRIC_PARAMETERS), or None
+            for DEFAULT_METRICS. The DataFrame must contain their columns.
+        **year_options: Year range and breakdown options passed to analyze_year_matrix.
 
     Returns:
         A dictionary containing the structured analytical results for the window.
     """
     if harmonized_df.empty:
         return {"error": "Input DataFrame is empty."}
+    return analyze_year_matrix(
+        YearMatrix.from_frame(harmonized_df), target_date_str, metrics=metrics, **year_options
+    )
+
+
+def analyze_year_matrix(matrix: YearMatrix, target_date_str: str,
+                        metrics: Optional[List[str]] = None,
+                        start_year: Optional[int] = None,
+                        end_year: Optional[int] = None,
+                        recent_years: Optional[int] = None,
+                        include_yearly: bool = False,
+                        include_trend: bool = False) -> Dict[str, Any]:
+    """
+    Analyzes a location's YearMatrix for a 31-day window.
+
+    Each year contributes one complete window, labelled by the year of the
+    target date, so windows crossing the new year combine December of one
+    year with January of the next.
+
+    Args:
+        matrix: The location's historical data as a YearMatrix.
+        target_date_str: The user's target future date (e.g., "2025-10-08").
+        metrics: Analysis sections to compute (see METRIC_PARAMETERS), or None
+            for DEFAULT_METRICS. The matrix must contain their columns.
+        start_year: First year to include, or None for the earliest available.
+        end_year: Last year to include, or None for the latest available.
+        recent_years: Number of most recent years to include instead of start_year.
+        include_yearly: Add each section's statistics for every year.
+        include_trend: Add the linear trend of each statistic per decade.
+
+    Returns:
+        A dictionary containing the structured analytical results for the window.
+
+    Raises:
+        ValueError: If the year options conflict.
+    """
+    validate_year_options(start_year, end_year, recent_years)
+    metrics = metrics or DEFAULT_METRICS
 
     # --- 1. Define the 31-Day Date Window ---
-    # The 'Date' column is already created in the harmonization step.
-    
+    start_date, end_date = analysis_window(target_date_str)
     target_date = datetime.strptime(target_date_str, '%Y-%m-%d')
-    start_date = target_date - timedelta(days=settings.ANALYSIS_WINDOW_HALF)
-    end_date = target_date + timedelta(days=settings.ANALYSIS_WINDOW_HALF)
-    
-    start_doy = start_date.timetuple().tm_yday
-    end_doy = end_date.timetuple().tm_yday
-    
-    # --- 2. Filter Data for the Target Window ---
-    # Create a "day of year" column from the existing 'Date' column.
-    df_with_doy = harmonized_df.copy()
-    df_with_doy['doy'] = df_with_doy['Date'].dt.dayofyear
-    
-    if start_doy > end_doy:  # Handles windows crossing the new year
-        window_slice = df_with_doy[
-            (df_with_doy['doy'] >= start_doy) | (df_with_doy['doy'] <= end_doy)
-        ].copy()
-    else:
-        window_slice = df_with_doy[
-            (df_with_doy['doy'] >= start_doy) & (df_with_doy['doy'] <= end_doy)
-        ].copy()
-
-    if window_slice.empty:
-        return {"error": f"No historical data found for the window around {target_date_str}."}
+    slots, offsets = window_slots(start_date, end_date, target_date)
 
-    # --- 3. Perform Statistical Calculations (using new column names) ---
-    days_with_rain = window_slice[window_slice['Precipitation_mm'] > settings.PRECIPITATION_THRESHOLD_MM].shape[0]
-    total_days_in_slice = window_slice.shape[0]
-    rain_chance = (days_with_rain / total_days_in_slice) * 100 if total_days_in_slice > 0 else 0
+    # --- 2. Select the Years to Analyze ---
+    first, last = resolve_year_range(matrix, offsets, start_year, end_year, recent_years)
+    if first > last:
+        return {"error": f"No historical data found for the window around {target_date_str}."}
+    years = np.arange(first, last + 1)
 
-    # Convert m/s to km/h
-    window_slice['Wind_Speed_kmh'] = window_slice['Wind_Speed_m/s'] * settings.WIND_SPEED_CONVERSION_FACTOR
-    window_slice['Max_Wind_Speed_kmh'] = window_slice['Max_Wind_Speed_m/s'] * settings.WIND_SPEED_CONVERSION_FACTOR
-    
-    # Get the number of unique years from the 'Date' column
-    total_years = window_slice['Date'].dt.year.nunique()
+    # --- 3. Perform Statistical Calculations on Each Column's Window ---
+    # Windows are views of the matrix unless they cross the new year, and each
+    # column's missing-day mask is computed once for all its statistics.
+    windows = {}
+    has_data = np.zeros(len(years), dtype=bool)
+    for metric in metrics:
+        for _, column, _ in SECTION_STATISTICS[metric]:
+            if column not in windows:
+                values = matrix.window(column, slots, offsets, first, last)
+                present = np.isnan(values)
+                np.logical_not(present, out=present)
+                has_data |= present.any(axis=1)
+                windows[column] = (values, present)
 
-    # --- 4. Structure the Output JSON (using new column names) ---
+    # --- 4. Structure the Output JSON ---
     analysis_results = {
-        "total_years_analyzed": total_years,
+        "total_years_analyzed": int(has_data.sum()),
         "analysis_window": {
             "start_date": start_date.strftime('%b %d'),
             "end_date": end_date.strftime('%b %d')
         },
-        "temperature": {
-            "average_c": window_slice['Avg_Temperature_C'].mean(),
-            "range_min_c": window_slice['Min_Temperature_C'].mean(),
-            "range_max_c": window_slice['Max_Temperature_C'].mean()
-        },
-        "precipitation": {
-            "rain_chance_percent": rain_chance,
-            "max_daily_mm": window_slice['Precipitation_mm'].max()
-        },
-        "wind": {
-            "average_kmh": window_slice['Wind_Speed_kmh'].mean(),
-            "max_kmh": window_slice['Max_Wind_Speed_kmh'].max()
-        },
-        "humidity": {
-            "average_percent": window_slice['Humidity_Percent'].mean()
+        "year_range": {
+            "start_year": int(first),
+            "end_year": int(last)
         }
     }
-    
-    # Round all numeric values for a clean output
-    for category, metrics in analysis_results.items():
-        if isinstance(metrics, dict):
-            for key, value in metrics.items():
-                if isinstance(value, (int, float)):
-                    metrics[key] = round(value, settings.DECIMAL_PLACES)
+    yearly = {"years": years.tolist()}
+    statistics = []
+
+    for metric in METRIC_PARAMETERS:
+        if metric not in metrics:
+            continue
+        section = {}
+        for key, column, reduction in SECTION_STATISTICS[metric]:
+            # Mean and max commute with the m/s to km/h conversion, so wind is
+            # converted after reducing instead of scaling the whole window.
+            scale = settings.WIND_SPEED_CONVERSION_FACTOR if column in _WIND_COLUMNS else 1
+            section[key] = _rounded(_reduce(*windows[column], reduction) * scale)
+            if include_yearly or include_trend:
+                per_year = _reduce(*windows[column], reduction, axis=1)
+                per_year *= scale
+                statistics.append((metric, key, per_year))
+                if include_yearly:
+                    yearly.setdefault(metric, {})[key] = [_rounded(value) for value in per_year]
+        analysis_results[metric] = section
+
+    if include_yearly:
+        analysis_results["yearly"] = yearly
+
+    if include_trend:
+        slopes = _trend_slopes(years, np.array([per_year for _, _, per_year in statistics]))
+        trend = {}
+        for (metric, key, _), slope in zip(statistics, slopes):
+            trend.setdefault(metric, {})[f"{key}_per_decade"] = _rounded(slope)
+        analysis_results["trend"] = trend
 
     return analysis_results
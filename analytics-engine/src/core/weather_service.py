@@ -5,37 +5,234 @@ This module combines data fetching, harmonization, and analysis into a single se
 that can be used by FastAPI endpoints.
 """
 
-from typing import Dict, Any
+from __future__ import annotations
+
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from config.settings import settings
+from ..lazy_imports import lazy_import
+from .admission import AdmissionRejected, admission_controller
+from .cache import LRUCache, grid_cell
 from .data_fetcher import fetch_historical_data
-from .data_harmonizer import harmonize_data
-from .weather_analyzer import analyze_historical_data
+from .data_harmonizer import POWER_COLUMN_NAMES
+from .parameter_store import parameter_store, split_raw_data
+from .stage_timing import mark_failed, stage
+from .weather_analyzer import analyze_year_matrix, parameters_for_metrics
+from .year_matrix import YearMatrix
+
+np = lazy_import("numpy")
+
+
+# Year × day-of-year matrices keyed by (grid cell, parameters)
+year_matrix_cache = LRUCache(max_entries=settings.DATA_CACHE_MAX_CELLS)
+
+
+class _SharedFetch:
+    """An upstream fetch in progress for one grid cell, awaited by concurrent misses."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        # Set when an interactive request waits on a fetch started by bulk work
+        self.promoted = threading.Event()
+        self.failed = False
+        self.rejection: Optional[AdmissionRejected] = None
+
+
+# Fetches in progress keyed by grid cell; entries are removed when they finish
+_shared_fetches: Dict[Tuple[float, float], _SharedFetch] = {}
+_shared_fetches_guard = threading.Lock()
+
+
+def _fetch_missing(cell: Tuple[float, float], parameters: List[str], bulk: bool) -> bool:
+    """
+    Fetches and stores the parameters missing for a grid cell.
+
+    Concurrent requests for the same cell share one upstream fetch. Requests
+    that join a fetch in progress wait for it within the same bound as a wait
+    for a fetch slot, and share its outcome, so a failed fetch is reported to
+    every waiter instead of being retried by each in turn. An interactive
+    request that joins a fetch started by bulk work raises that fetch to
+    interactive priority, so it does not wait behind the interactive queue.
+
+    Args:
+        cell: The grid cell.
+        parameters: The parameters the caller needs.
+        bulk: True for background work, which yields fetch slots to interactive requests.
+
+    Returns:
+        True if every parameter is now stored, False if the fetch failed.
+
+    Raises:
+        AdmissionRejected: If an interactive request cannot be admitted in time.
+    """
+    while True:
+        missing = parameter_store.missing_parameters(cell, parameters)
+        if not missing:
+            return True
+        with _shared_fetches_guard:
+            shared = _shared_fetches.get(cell)
+            if shared is None:
+                shared = _shared_fetches[cell] = _SharedFetch()
+                break
+        if not bulk:
+            # Interactive traffic must not queue behind bulk work, so a bulk
+            # fetch still waiting for a slot is raised to interactive priority.
+            admission_controller.promote(shared.promoted)
+        admission_controller.wait_for_shared_fetch(shared.done, bulk=bulk)
+        if shared.rejection is not None and not bulk:
+            raise AdmissionRejected(str(shared.rejection), shared.rejection.retry_after)
+        if shared.failed:
+            return False
+        # The fetch succeeded or was abandoned, so this request may start its
+        # own; it may also not have covered all of our parameters.
+
+    try:
+        # A fetch that finished just before this one started may have stored them.
+        missing = parameter_store.missing_parameters(cell, parameters)
+        if not missing:
+            return True
+        with admission_controller.upstream_fetch(bulk=bulk, promoted=shared.promoted), stage("fetch"):
+            raw_data = fetch_historical_data(*cell, parameters=missing)
+        if raw_data.empty:
+            shared.failed = True
+            return False
+        parameter_store.save(cell, *split_raw_data(raw_data, missing))
+        return True
+    except AdmissionRejected as rejection:
+        # A bulk request that gave up leaves the fetch to whoever waits for it.
+        if not bulk:
+            shared.rejection = rejection
+        raise
+    except Exception:
+        shared.failed = True
+        raise
+    finally:
+        with _shared_fetches_guard:
+            del _shared_fetches[cell]
+        shared.done.set()
+
+
+def is_cached(latitude: float, longitude: float, metrics: Optional[List[str]] = None) -> bool:
+    """Return True if the location can be analyzed without an upstream fetch."""
+    cell = grid_cell(latitude, longitude)
+    return not parameter_store.missing_parameters(cell, parameters_for_metrics(metrics))
+
+
+def is_loaded(latitude: float, longitude: float, metrics: Optional[List[str]] = None) -> bool:
+    """Return True if the location's year matrix is already in memory."""
+    cache_key = (grid_cell(latitude, longitude), tuple(parameters_for_metrics(metrics)))
+    return cache_key in year_matrix_cache
+
+
+def load_columns(latitude: float, longitude: float,
+                 metrics: Optional[List[str]] = None,
+                 bulk: bool = False) -> Tuple[Optional[np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Returns the stored historical columns for a location, fetching any that are missing.
+
+    Only the parameters needed for the requested metrics are loaded, and only
+    those not already stored for the grid cell are fetched from NASA POWER.
 
+    Args:
+        latitude: The latitude of the location (-90 to 90).
+        longitude: The longitude of the location (-180 to 180).
+        metrics: Analysis sections the data is needed for, or None for the defaults.
+        bulk: True for background work, which yields fetch slots to interactive requests.
+
+    Returns:
+        A (dates, columns) tuple as returned by ParameterStore.load, or
+        (None, {}) if the fetch failed.
 
-def get_weather_analysis(latitude: float, longitude: float, target_date_str: str) -> Dict[str, Any]:
+    Raises:
+        AdmissionRejected: If an interactive fetch cannot be admitted.
+    """
+    cell = grid_cell(latitude, longitude)
+    parameters = parameters_for_metrics(metrics)
+    if not _fetch_missing(cell, parameters, bulk):
+        mark_failed("fetch")
+        return None, {}
+
+    with stage("load"):
+        dates, columns = parameter_store.load(cell, parameters)
+    if dates is None or len(columns) < len(parameters):
+        return None, {}
+    return dates, columns
+
+
+def load_year_matrix(latitude: float, longitude: float,
+                     metrics: Optional[List[str]] = None,
+                     bulk: bool = False) -> Optional[YearMatrix]:
+    """
+    Returns the historical data for a location as a year × day-of-year matrix.
+
+    The matrix is built directly from the stored columns, without going
+    through a harmonized DataFrame.
+
+    Args:
+        latitude: The latitude of the location (-90 to 90).
+        longitude: The longitude of the location (-180 to 180).
+        metrics: Analysis sections the data is needed for, or None for the defaults.
+        bulk: True for background work, which yields fetch slots to interactive requests.
+
+    Returns:
+        The YearMatrix, or None if the fetch failed.
+
+    Raises:
+        AdmissionRejected: If an interactive fetch cannot be admitted.
+    """
+    cache_key = (grid_cell(latitude, longitude), tuple(parameters_for_metrics(metrics)))
+    matrix = year_matrix_cache.get(cache_key)
+    if matrix is not None:
+        return matrix
+
+    dates, columns = load_columns(latitude, longitude, metrics=metrics, bulk=bulk)
+    if dates is None:
+        return None
+    with stage("harmonize"):
+        matrix = YearMatrix.from_columns(dates, {
+            POWER_COLUMN_NAMES[parameter]: values for parameter, values in columns.items()
+        })
+    year_matrix_cache.put(cache_key, matrix)
+    return matrix
+
+
+def get_weather_analysis(latitude: float, longitude: float, target_date_str: str,
+                         metrics: Optional[List[str]] = None,
+                         bulk: bool = False, **year_options) -> Dict[str, Any]:
     """
     Orchestrates the fetching, harmonization, and analysis of weather data.
-    
+
     Args:
         latitude: The latitude of the location (-90 to 90).
         longitude: The longitude of the location (-180 to 180).
         target_date_str: The user's target future date (e.g., "2025-10-08").
-        
+        metrics: Analysis sections to compute, or None for the defaults.
+        bulk: True for background work, which yields fetch slots to interactive requests.
+        **year_options: Year range and breakdown options (start_year, end_year,
+            recent_years, include_yearly, include_trend); see analyze_year_matrix.
+
     Returns:
         A dictionary containing the complete weather analysis results.
+
+    Raises:
+        AdmissionRejected: If an interactive fetch cannot be admitted.
+        ValueError: If a metric name is not recognised or the year options conflict.
     """
     print("--- Starting CloudQuery Phase 1 Analytical Engine ---")
-    
-    # Step 1: Fetch raw data from NASA POWER API
-    raw_data = fetch_historical_data(latitude, longitude)
-    if raw_data.empty:
+
+    # Steps 1 and 2: Fetch and harmonize the data, reusing stored parameters,
+    # laid out as a year × day-of-year matrix
+    year_matrix = load_year_matrix(latitude, longitude, metrics=metrics, bulk=bulk)
+    if year_matrix is None:
         return {"error": "Failed to fetch data from NASA POWER."}
-    
-    # Step 2: Harmonize the data
-    harmonized_data = harmonize_data(raw_data)
-    
+
     # Step 3: Perform analysis
-    final_analysis = analyze_historical_data(harmonized_data, target_date_str)
-    
+    with stage("analyze"):
+        final_analysis = analyze_year_matrix(
+            year_matrix, target_date_str, metrics=metrics, **year_options
+        )
+
     print("--- Analytical Engine Finished ---")
-    
+
     return final_analysis
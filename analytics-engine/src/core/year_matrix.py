@@ -0,0 +1,204 @@
+"""
+Year × day-of-year layout of historical weather data.
+
+Each harmonized column is reshaped into a matrix with one row per year and
+366 columns, one per calendar day of a leap year, so a given month and day
+always sits in the same column. February 29 has its own column, which is NaN
+in non-leap years, and every later day keeps its column whether or not the
+year is a leap year. A date window then becomes a column slice, a year range a
+row slice, and statistics for every year in the window reduce along one axis.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from ..lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+DAYS_PER_ROW = 366
+
+# Column of the first day of each month in a leap year
+_MONTH_SLOTS = (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+
+
+def day_slot(month: int, day: int) -> int:
+    """Return the matrix column for a month and day."""
+    return _MONTH_SLOTS[month - 1] + day - 1
+
+
+def window_slots(start_date: datetime, end_date: datetime,
+                 target_date: datetime) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Maps a date window onto matrix columns.
+
+    Args:
+        start_date: First date of the window.
+        end_date: Last date of the window.
+        target_date: The date the window is centred on.
+
+    Returns:
+        A (slots, year_offsets) tuple of equal-length arrays: the matrix column
+        of each calendar day in the window (including February 29 when the
+        window spans it), and that day's year relative to the target date's.
+    """
+    start = day_slot(start_date.month, start_date.day)
+    end = day_slot(end_date.month, end_date.day)
+    if start <= end:
+        slots = np.arange(start, end + 1)
+        offsets = np.full(len(slots), start_date.year - target_date.year)
+    else:
+        # The window crosses the new year.
+        before, after = np.arange(start, DAYS_PER_ROW), np.arange(0, end + 1)
+        slots = np.concatenate([before, after])
+        offsets = np.concatenate([
+            np.full(len(before), start_date.year - target_date.year),
+            np.full(len(after), end_date.year - target_date.year)
+        ])
+    return slots, offsets
+
+
+class YearMatrix:
+    """Historical columns for one location laid out as year × day-of-year matrices."""
+
+    def __init__(self, first_year: int, columns: Dict[str, np.ndarray]):
+        """
+        Initialize the matrix.
+
+        Args:
+            first_year: The year of the first row.
+            columns: Column name to a (years, DAYS_PER_ROW) float array, NaN where
+                there is no data.
+        """
+        self.first_year = first_year
+        self.columns = columns
+        self.year_count = next(iter(columns.values())).shape[0] if columns else 0
+
+    @property
+    def last_year(self) -> int:
+        return self.first_year + self.year_count - 1
+
+    @classmethod
+    def from_columns(cls, dates: np.ndarray, columns: Dict[str, np.ndarray]) -> "YearMatrix":
+        """
+        Builds the matrix straight from stored columns, without a DataFrame.
+
+        Args:
+            dates: YYYYMMDD integers for the rows of the columns.
+            columns: Column name to values aligned with dates.
+
+        Returns:
+            A YearMatrix holding the given columns.
+        """
+        slots = np.asarray(_MONTH_SLOTS, dtype=np.int32)[dates // 100 % 100 - 1]
+        slots += dates % 100
+        slots -= 1
+        return cls._scatter(dates // 10000, slots, columns)
+
+    @classmethod
+    def from_frame(cls, harmonized_df: pd.DataFrame) -> "YearMatrix":
+        """
+        Builds the matrix from a harmonized DataFrame.
+
+        Args:
+            harmonized_df: DataFrame that has been processed by the harmonize_data function.
+
+        Returns:
+            A YearMatrix holding every column except 'Date'.
+        """
+        dates = harmonized_df['Date'].dt
+        slots = np.asarray(_MONTH_SLOTS, dtype=np.int32)[dates.month.to_numpy() - 1]
+        slots += dates.day.to_numpy()
+        slots -= 1
+        columns = {
+            name: harmonized_df[name].to_numpy(dtype=np.float64)
+            for name in harmonized_df.columns if name != 'Date'
+        }
+        return cls._scatter(dates.year.to_numpy(), slots, columns)
+
+    @classmethod
+    def _scatter(cls, years: np.ndarray, slots: np.ndarray,
+                 columns: Dict[str, np.ndarray]) -> "YearMatrix":
+        """Place each column's values at their (year, slot) cells of a NaN-filled matrix."""
+        first_year = int(years.min())
+        shape = (int(years.max()) - first_year + 1, DAYS_PER_ROW)
+        # Flat offsets into a row-major matrix, computed once for all columns.
+        positions = years - first_year
+        positions *= DAYS_PER_ROW
+        positions += slots
+
+        matrices = {}
+        for name, values in columns.items():
+            matrix = np.full(shape, np.nan)
+            matrix.ravel()[positions] = values
+            matrix.setflags(write=False)
+            matrices[name] = matrix
+        return cls(first_year, matrices)
+
+    def complete_years(self, offsets: np.ndarray) -> Tuple[int, int]:
+        """
+        Returns the range of window years whose every day falls inside the data.
+
+        Args:
+            offsets: Year offsets returned by window_slots.
+
+        Returns:
+            A (first, last) tuple; first is greater than last if there are none.
+        """
+        return self.first_year - int(offsets.min()), self.last_year - int(offsets.max())
+
+    def window(self, name: str, slots: np.ndarray, offsets: np.ndarray,
+               first: int, last: int) -> np.ndarray:
+        """
+        Returns one column's values for a window in each year of a range.
+
+        Args:
+            name: The column name.
+            slots: Matrix columns from window_slots.
+            offsets: Year offsets from window_slots.
+            first: First window year, labelled by the target date's year.
+            last: Last window year; the range must lie within complete_years.
+
+        Returns:
+            A (years, window days) array. It is a view of the matrix when the
+            window does not cross the new year.
+        """
+        matrix = self.columns[name]
+        row = first - self.first_year
+        if offsets.min() == offsets.max():
+            row += int(offsets[0])
+            return matrix[row:row + last - first + 1, slots[0]:slots[-1] + 1]
+        rows = np.arange(row, row + last - first + 1)[:, None] + offsets
+        return matrix[rows, slots]
+
+
+def resolve_year_range(matrix: YearMatrix, offsets: np.ndarray,
+                       start_year: Optional[int] = None,
+                       end_year: Optional[int] = None,
+                       recent_years: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Clips a requested year range to the complete windows available.
+
+    Args:
+        matrix: The location's YearMatrix.
+        offsets: Year offsets from window_slots.
+        start_year: First year to include, or None for the earliest available.
+        end_year: Last year to include, or None for the latest available.
+        recent_years: Number of most recent years to include, counted back from
+            end_year; mutually exclusive with start_year.
+
+    Returns:
+        A (first, last) tuple; first is greater than last if the range is empty.
+    """
+    first, last = matrix.complete_years(offsets)
+    if end_year is not None:
+        last = min(last, end_year)
+    if recent_years is not None:
+        first = max(first, last - recent_years + 1)
+    elif start_year is not None:
+        first = max(first, start_year)
+    return first, last
@@ -0,0 +1,155 @@
+"""
+Deferred imports and import-time profiling.
+
+Heavy third-party modules (pandas, numpy, requests, google.generativeai) are
+imported through lazy_import, which returns a placeholder module that imports
+the real one on first attribute access when LAZY_IMPORTS is enabled. This keeps
+worker cold starts fast; the startup warm-up then loads them in the
+background before the readiness probe reports ready.
+
+When PROFILE_IMPORTS is enabled, every module imported after this package is
+loaded is timed, and the slowest imports can be reported at startup.
+"""
+
+import importlib
+import importlib.abc
+import importlib.util
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Dict, List, Tuple
+
+from config.settings import settings
+
+
+# Wall-clock seconds spent executing each module, including its own imports
+import_timings: Dict[str, float] = {}
+# The same, excluding time spent importing other profiled modules
+import_self_timings: Dict[str, float] = {}
+
+_profile_stack = threading.local()
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Loader wrapper that records how long a module takes to execute."""
+
+    def __init__(self, loader: importlib.abc.Loader, name: str):
+        self._loader = loader
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType):
+        stack = getattr(_profile_stack, "frames", None)
+        if stack is None:
+            stack = _profile_stack.frames = []
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            import_timings[self._name] = elapsed
+            import_self_timings[self._name] = elapsed - children
+
+    def __getattr__(self, name: str):
+        # Resource and source lookups go to the real loader.
+        return getattr(self._loader, name)
+
+
+class _ImportProfiler(importlib.abc.MetaPathFinder):
+    """Meta path finder that wraps every found module's loader in a _TimedLoader."""
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, fullname)
+                return spec
+        return None
+
+
+def install_import_profiler():
+    """Start timing all subsequent imports if PROFILE_IMPORTS is enabled."""
+    if settings.PROFILE_IMPORTS and not any(
+        isinstance(finder, _ImportProfiler) for finder in sys.meta_path
+    ):
+        sys.meta_path.insert(0, _ImportProfiler())
+
+
+def slowest_imports(limit: int = 20) -> List[Tuple[str, float, float]]:
+    """
+    Returns the slowest timed imports.
+
+    Args:
+        limit: Maximum number of modules to return.
+
+    Returns:
+        (module, cumulative_seconds, self_seconds) tuples, slowest first.
+    """
+    ranked = sorted(import_timings.items(), key=lambda item: item[1], reverse=True)
+    return [
+        (name, seconds, import_self_timings.get(name, seconds))
+        for name, seconds in ranked[:limit]
+    ]
+
+
+class _LazyModule(ModuleType):
+    """Placeholder that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    self._module = importlib.import_module(self.__name__)
+                    import_timings.setdefault(self.__name__, time.perf_counter() - start)
+                module = self._module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Imports a module, deferring the import until first use if LAZY_IMPORTS is set.
+
+    Args:
+        name: The fully qualified module name.
+
+    Returns:
+        The module, or a placeholder that imports it on first attribute access.
+
+    Raises:
+        ModuleNotFoundError: If the module is not installed.
+    """
+    if name in sys.modules or not settings.LAZY_IMPORTS:
+        return importlib.import_module(name)
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    return _LazyModule(name)
+
+
+def ensure_loaded(module: ModuleType) -> ModuleType:
+    """Import a lazily imported module now and return the real module."""
+    if isinstance(module, _LazyModule):
+        return module._load()
+    return module
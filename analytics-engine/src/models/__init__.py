@@ -4,9 +4,22 @@ Data models for request/response validation.
 This package contains Pydantic models for API request and response validation.
 """
 
-from .weather_models import WeatherAnalysisRequest, WeatherAnalysisResponse
+from .weather_models import (
+    WeatherAnalysisRequest,
+    WeatherAnalysisResponse,
+    BatchAnalysisItem,
+    BatchAnalysisRequest,
+    CalendarAnalysisRequest,
+    RegionAnalysisRequest,
+    JobStatusResponse
+)
 
 __all__ = [
     "WeatherAnalysisRequest",
-    "WeatherAnalysisResponse"
+    "WeatherAnalysisResponse",
+    "BatchAnalysisItem",
+    "BatchAnalysisRequest",
+    "CalendarAnalysisRequest",
+    "RegionAnalysisRequest",
+    "JobStatusResponse"
 ]
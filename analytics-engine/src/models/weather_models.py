@@ -5,7 +5,7 @@ This module defines the request and response models for the weather analysis API
 """
 
 from pydantic import BaseModel, Field
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 
 class WeatherAnalysisRequest(BaseModel):
@@ -15,6 +15,24 @@ class WeatherAnalysisRequest(BaseModel):
     target_date: str = Field(..., description="Target date in YYYY-MM-DD format")
     user_activity: str = Field(..., description="User activity type (e.g., 'Outdoor Picnic', 'Hiking', 'Wedding')")
     user_activity_desc: str = Field(..., description="Detailed description of the user activity")
+    metrics: Optional[List[str]] = Field(
+        None,
+        description="Analysis sections to compute (temperature, precipitation, wind, humidity, "
+                    "solar, cloud_cover, snow). Defaults to temperature, precipitation, wind and humidity."
+    )
+    start_year: Optional[int] = Field(None, description="First year of history to analyze")
+    end_year: Optional[int] = Field(None, description="Last year of history to analyze")
+    recent_years: Optional[int] = Field(
+        None, ge=1, description="Analyze only this many most recent years (instead of start_year)"
+    )
+    include_yearly: bool = Field(False, description="Include each statistic for every year analyzed")
+    include_trend: bool = Field(False, description="Include the linear trend of each statistic per decade")
+
+    def year_options(self) -> Dict[str, Any]:
+        """Return the year range and breakdown options of the request."""
+        return self.model_dump(include={
+            "start_year", "end_year", "recent_years", "include_yearly", "include_trend"
+        })
 
     class Config:
         json_schema_extra = {
@@ -33,3 +51,53 @@ class WeatherAnalysisResponse(BaseModel):
     success: bool
     data: Dict[str, Any] = None
     error: str = None
+
+
+class BatchAnalysisItem(BaseModel):
+    """A single location and date within a batch analysis job."""
+    latitude: float = Field(..., ge=-90, le=90, description="Latitude (-90 to 90)")
+    longitude: float = Field(..., ge=-180, le=180, description="Longitude (-180 to 180)")
+    target_date: str = Field(..., description="Target date in YYYY-MM-DD format")
+
+
+class BatchAnalysisRequest(BaseModel):
+    """Request model for a batch analysis job over arbitrary locations and dates."""
+    items: List[BatchAnalysisItem] = Field(..., min_length=1, description="Analyses to run")
+    priority: int = Field(5, ge=0, le=9, description="Job priority (0 runs first)")
+
+
+class CalendarAnalysisRequest(BaseModel):
+    """Request model for a calendar analysis job: one location, every date in a range."""
+    latitude: float = Field(..., ge=-90, le=90, description="Latitude (-90 to 90)")
+    longitude: float = Field(..., ge=-180, le=180, description="Longitude (-180 to 180)")
+    start_date: str = Field(..., description="First target date in YYYY-MM-DD format")
+    end_date: str = Field(..., description="Last target date in YYYY-MM-DD format")
+    priority: int = Field(5, ge=0, le=9, description="Job priority (0 runs first)")
+
+
+class RegionAnalysisRequest(BaseModel):
+    """Request model for a region analysis job: one date over a grid of locations."""
+    lat_min: float = Field(..., ge=-90, le=90, description="Southern bound")
+    lat_max: float = Field(..., ge=-90, le=90, description="Northern bound")
+    lon_min: float = Field(..., ge=-180, le=180, description="Western bound")
+    lon_max: float = Field(..., ge=-180, le=180, description="Eastern bound")
+    target_date: str = Field(..., description="Target date in YYYY-MM-DD format")
+    step_degrees: Optional[float] = Field(None, gt=0, description="Grid spacing in degrees")
+    priority: int = Field(5, ge=0, le=9, description="Job priority (0 runs first)")
+
+
+class JobStatusResponse(BaseModel):
+    """Response model describing a background analysis job."""
+    job_id: str
+    kind: str
+    status: str
+    priority: int
+    total_items: int
+    completed_items: int
+    failed_items: int
+    progress_percent: float
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    expires_at: Optional[str] = None
@@ -0,0 +1,245 @@
+"""
+Behaviour of admission control and of shared upstream fetches.
+
+The controller is exercised directly with threads holding its slots; the
+shared-fetch tests run load_columns against a temporary parameter store with
+fetch_historical_data replaced by a counting fake.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.core.weather_service as weather_service
+from src.core.admission import AdmissionController, AdmissionRejected
+from src.core.parameter_store import ParameterStore
+
+
+def _controller(max_upstream_fetches=1, max_queued_fetches=4, queue_timeout_seconds=5.0):
+    return AdmissionController(
+        max_upstream_fetches=max_upstream_fetches,
+        max_llm_calls=1,
+        max_queued_fetches=max_queued_fetches,
+        queue_timeout_seconds=queue_timeout_seconds,
+        retry_after_seconds=1
+    )
+
+
+def _hold_slot(controller, bulk=False):
+    """Take a fetch slot in a thread; returns (release event, thread)."""
+    held, release = threading.Event(), threading.Event()
+
+    def hold():
+        with controller.upstream_fetch(bulk=bulk):
+            held.set()
+            release.wait(10)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    assert held.wait(5)
+    return release, thread
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.01)
+
+
+# --- Admission controller ---
+
+def test_interactive_request_rejected_when_queue_is_full():
+    controller = _controller(max_queued_fetches=0)
+    release, thread = _hold_slot(controller)
+    try:
+        with pytest.raises(AdmissionRejected) as rejected:
+            with controller.upstream_fetch():
+                pass
+        assert rejected.value.retry_after == 1
+        assert controller.stats()["rejected_fetches"] == 1
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_interactive_request_times_out_waiting_for_a_slot():
+    controller = _controller(queue_timeout_seconds=0.1)
+    release, thread = _hold_slot(controller)
+    try:
+        with pytest.raises(AdmissionRejected):
+            with controller.upstream_fetch():
+                pass
+        assert controller.stats()["requests_waiting"] == 0
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_bulk_request_yields_to_waiting_interactive_request():
+    controller = _controller()
+    release, thread = _hold_slot(controller)
+    order = []
+
+    def fetch(name, bulk):
+        with controller.upstream_fetch(bulk=bulk):
+            order.append(name)
+
+    bulk = threading.Thread(target=fetch, args=("bulk", True))
+    bulk.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=fetch, args=("interactive", False))
+    interactive.start()
+    _wait_until(lambda: controller.stats()["requests_waiting"] == 1)
+    release.set()
+    for worker in (thread, bulk, interactive):
+        worker.join(5)
+    assert order == ["interactive", "bulk"]
+
+
+def test_promoted_bulk_request_goes_before_plain_bulk_request():
+    controller = _controller()
+    release, thread = _hold_slot(controller)
+    order = []
+    promoted = threading.Event()
+
+    def fetch(name, promoted_event=None):
+        with controller.upstream_fetch(bulk=True, promoted=promoted_event):
+            order.append(name)
+
+    plain = threading.Thread(target=fetch, args=("plain",))
+    plain.start()
+    time.sleep(0.05)
+    raised = threading.Thread(target=fetch, args=("promoted", promoted))
+    raised.start()
+    time.sleep(0.05)
+    controller.promote(promoted)
+    _wait_until(lambda: controller.stats()["requests_waiting"] == 1)
+    release.set()
+    for worker in (thread, plain, raised):
+        worker.join(5)
+    assert order == ["promoted", "plain"]
+
+
+def test_bulk_wait_limit_gives_up_at_deadline():
+    controller = _controller()
+    release, thread = _hold_slot(controller)
+    try:
+        with controller.bulk_wait_limit(time.monotonic() + 0.1):
+            with pytest.raises(AdmissionRejected):
+                with controller.upstream_fetch(bulk=True):
+                    pass
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_llm_call_is_skipped_when_budget_is_used():
+    controller = _controller()
+    with controller.llm_call() as first, controller.llm_call() as second:
+        assert (first, second) == (True, False)
+    assert controller.stats()["downgraded_llm_calls"] == 1
+
+
+# --- Shared fetches ---
+
+class _FakeFetch:
+    """Stands in for fetch_historical_data, blocking until released."""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, latitude, longitude, parameters):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(10)
+        if self.fail:
+            return pd.DataFrame()
+        dates = pd.date_range("2020-01-01", "2021-12-31")
+        frame = pd.DataFrame({"YEAR": dates.year, "MO": dates.month, "DY": dates.day})
+        for parameter in parameters:
+            frame[parameter] = np.arange(len(dates), dtype=np.float64)
+        return frame
+
+
+@pytest.fixture
+def shared_fetch_setup(monkeypatch, tmp_path):
+    controller = _controller(queue_timeout_seconds=5.0)
+    monkeypatch.setattr(weather_service, "parameter_store", ParameterStore(str(tmp_path), 64))
+    monkeypatch.setattr(weather_service, "admission_controller", controller)
+
+    def install(fetch):
+        monkeypatch.setattr(weather_service, "fetch_historical_data", fetch)
+        return controller
+
+    return install
+
+
+def _load_in_threads(count, bulk=False):
+    results = [None] * count
+
+    def load(index):
+        try:
+            dates, _ = weather_service.load_columns(10.0, 20.0, bulk=bulk)
+            results[index] = dates is not None
+        except AdmissionRejected as rejected:
+            results[index] = rejected
+
+    threads = [threading.Thread(target=load, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_misses_share_one_fetch(shared_fetch_setup):
+    fetch = _FakeFetch()
+    shared_fetch_setup(fetch)
+    threads, results = _load_in_threads(4)
+    assert fetch.started.wait(5)
+    time.sleep(0.1)
+    fetch.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == [True] * 4
+    assert fetch.calls == 1
+    assert not weather_service._shared_fetches
+
+
+def test_failed_fetch_is_reported_to_every_waiter(shared_fetch_setup):
+    fetch = _FakeFetch(fail=True)
+    shared_fetch_setup(fetch)
+    threads, results = _load_in_threads(3)
+    assert fetch.started.wait(5)
+    time.sleep(0.1)
+    fetch.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == [False] * 3
+    assert fetch.calls == 1
+
+
+def test_interactive_request_promotes_bulk_fetch_it_joins(shared_fetch_setup):
+    fetch = _FakeFetch()
+    fetch.release.set()
+    controller = shared_fetch_setup(fetch)
+    release, holder = _hold_slot(controller)
+
+    # The bulk fetch queues for the held slot, then an interactive request joins it.
+    bulk_threads, bulk_results = _load_in_threads(1, bulk=True)
+    _wait_until(lambda: (10.0, 20.0) in weather_service._shared_fetches)
+    interactive_threads, interactive_results = _load_in_threads(1)
+    _wait_until(lambda: weather_service._shared_fetches[(10.0, 20.0)].promoted.is_set())
+    _wait_until(lambda: controller.stats()["requests_waiting"] == 1)
+
+    release.set()
+    for thread in [holder, *bulk_threads, *interactive_threads]:
+        thread.join(5)
+    assert bulk_results == [True]
+    assert interactive_results == [True]
+    assert fetch.calls == 1
@@ -0,0 +1,63 @@
+"""
+Round trips through the stored column encoding for every available codec.
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from src.core.column_codec import available_codecs, decode_column, encode_column
+
+
+CODECS = available_codecs()
+
+
+def _mode_and_width(data: bytes):
+    # Header layout: magic, codec id, mode, integer width, ...
+    return struct.unpack_from("<4sBBB", data)[2:]
+
+
+def _assert_round_trip(values, codec):
+    decoded = decode_column(encode_column(values, codec=codec))
+    np.testing.assert_array_equal(decoded, np.asarray(values, dtype=np.float64))
+    return decoded
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_two_decimal_series_round_trips_in_fixed_point(codec):
+    values = np.round(np.random.default_rng(0).normal(15, 8, 1000), 2)
+    data = encode_column(values, codec=codec)
+    assert _mode_and_width(data) == (0, 2)
+    _assert_round_trip(values, codec)
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_missing_values_survive_round_trip(codec):
+    values = np.array([np.nan, np.nan, 1.25, 1.5, np.nan, np.nan, np.nan, -3.75, np.nan])
+    decoded = _assert_round_trip(values, codec)
+    assert np.isnan(decoded).sum() == 6
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_values_outside_fixed_point_fall_back_to_raw(codec):
+    values = np.array([1.0 / 3.0, 2.5, np.nan, 1e-7])
+    data = encode_column(values, codec=codec)
+    assert _mode_and_width(data) == (1, 8)
+    _assert_round_trip(values, codec)
+
+
+def test_large_jumps_use_a_wider_integer():
+    values = np.array([0.0, 1000.0, -1000.0])
+    assert _mode_and_width(encode_column(values, codec="none"))[1] == 4
+    _assert_round_trip(values, "none")
+
+
+def test_empty_and_all_missing_columns_round_trip():
+    _assert_round_trip(np.array([]), "zlib")
+    _assert_round_trip(np.full(10, np.nan), "zlib")
+
+
+def test_decode_rejects_foreign_data():
+    with pytest.raises(ValueError):
+        decode_column(b"XXXX" + bytes(16))
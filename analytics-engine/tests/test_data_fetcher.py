@@ -0,0 +1,72 @@
+"""
+Behaviour of fetch_historical_data against a local HTTP server.
+"""
+
+import http.server
+import threading
+
+import pytest
+
+from config.settings import settings
+from src.core.data_fetcher import fetch_historical_data
+
+
+CSV_BODY = (
+    "-BEGIN HEADER-\n"
+    "NASA/POWER test response\n"
+    "-END HEADER-\n"
+    "YEAR,MO,DY,T2M\n"
+    "2024,1,1,3.5\n"
+    "2024,1,2,-999\n"
+).encode()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    truncate = False
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        if self.truncate:
+            # Promise more bytes than are sent, then close mid-body.
+            self.send_header("Content-Length", str(len(CSV_BODY) + 4096))
+            self.end_headers()
+            self.wfile.write(CSV_BODY[:60])
+            self.wfile.flush()
+            self.connection.close()
+            return
+        self.send_header("Content-Length", str(len(CSV_BODY)))
+        self.end_headers()
+        self.wfile.write(CSV_BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def power_server(monkeypatch):
+    def serve(truncate: bool) -> None:
+        handler = type("Handler", (_Handler,), {"truncate": truncate})
+        server = http.server.HTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        monkeypatch.setattr(settings, "NASA_POWER_BASE_URL", f"http://127.0.0.1:{server.server_port}/")
+
+    servers = []
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_parses_csv_after_header(power_server):
+    power_server(truncate=False)
+    df = fetch_historical_data(1.0, 2.0, parameters=["T2M"])
+    assert list(df.columns) == ["YEAR", "MO", "DY", "T2M"]
+    assert df["T2M"].iloc[0] == 3.5
+    assert df["T2M"].isna().iloc[1]
+
+
+def test_truncated_stream_returns_empty_frame(power_server):
+    power_server(truncate=True)
+    assert fetch_historical_data(1.0, 2.0, parameters=["T2M"]).empty
@@ -0,0 +1,189 @@
+"""
+Behaviour of the SQLite-backed job queue.
+
+get_weather_analysis is replaced by a recording fake, so jobs run without any
+data. Most tests drive the claim and run steps directly; the last one starts
+two queues on the same database, as separate processes would.
+"""
+
+import threading
+import time
+
+import pytest
+
+import src.core.job_queue as job_queue_module
+from src.core.job_queue import (
+    JOB_CANCELLED, JOB_COMPLETED, JOB_QUEUED, JOB_RUNNING, JobQueue, expand_job_items
+)
+
+
+class _FakeAnalysis:
+    """Stands in for get_weather_analysis, recording each call."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+        self.on_call = None
+
+    def __call__(self, latitude, longitude, target_date, bulk=False):
+        with self._lock:
+            self.calls.append((latitude, longitude, target_date))
+        if self.on_call is not None:
+            self.on_call(len(self.calls))
+        return {"target_date": target_date}
+
+
+@pytest.fixture
+def analysis(monkeypatch):
+    fake = _FakeAnalysis()
+    monkeypatch.setattr(job_queue_module, "get_weather_analysis", fake)
+    return fake
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+def _queue(db_path, lease_seconds=60, result_ttl_seconds=3600):
+    return JobQueue(db_path=db_path, max_workers=2, result_ttl_seconds=result_ttl_seconds,
+                    sweep_interval_seconds=1, lease_seconds=lease_seconds)
+
+
+def _calendar(days, latitude=10.0):
+    return {"latitude": latitude, "longitude": 20.0,
+            "start_date": "2025-01-01", "end_date": f"2025-01-{days:02d}"}
+
+
+def _region():
+    return {"lat_min": 0.0, "lat_max": 0.3, "lon_min": 0.0, "lon_max": 0.1,
+            "step_degrees": 0.1, "target_date": "2025-07-01"}
+
+
+# --- Expansion ---
+
+def test_region_includes_bounds_a_whole_number_of_steps_away():
+    items = expand_job_items("region", _region())
+    assert len(items) == 8
+    assert items[-1]["latitude"] == 0.3 and items[-1]["longitude"] == 0.1
+
+
+def test_oversized_calendar_is_rejected_before_expansion(monkeypatch):
+    monkeypatch.setattr(job_queue_module.settings, "JOB_MAX_ITEMS", 10)
+    with pytest.raises(ValueError):
+        expand_job_items("calendar", {"latitude": 0, "longitude": 0,
+                                      "start_date": "2000-01-01", "end_date": "9999-12-31"})
+
+
+# --- Claiming and running ---
+
+def test_jobs_are_claimed_by_priority_then_age(db_path, analysis):
+    queue = _queue(db_path)
+    low = queue.submit("calendar", _calendar(2), priority=5)
+    high = queue.submit("calendar", _calendar(2), priority=1)
+    later_high = queue.submit("calendar", _calendar(2), priority=1)
+    claimed = [queue._claim_next()["id"] for _ in range(3)]
+    assert claimed == [high["id"], later_high["id"], low["id"]]
+    assert queue._claim_next() is None
+
+
+def test_job_runs_every_item_and_completes(db_path, analysis):
+    queue = _queue(db_path)
+    job = queue.submit("region", _region())
+    queue._run_job(queue._claim_next())
+
+    finished = queue.get_job(job["id"])
+    assert finished["status"] == JOB_COMPLETED
+    assert finished["completed_items"] == finished["total_items"] == 8
+    assert finished["lease_owner"] is None
+    assert sorted(result["seq"] for result in queue.get_results(job["id"])) == list(range(8))
+
+
+def test_interrupted_job_resumes_after_recorded_results(db_path, analysis):
+    first = _queue(db_path, lease_seconds=0)
+    job = first.submit("calendar", _calendar(5))
+    claimed = first._claim_next()
+    items = expand_job_items("calendar", claimed["params"])
+    for seq in range(2):
+        first._record_result(job["id"], seq, items[seq], {"target_date": items[seq]["target_date"]})
+
+    # The first process dies; its zero-second lease has already expired.
+    time.sleep(0.01)
+    second = _queue(db_path)
+    resumed = second._claim_next()
+    assert resumed["id"] == job["id"]
+    second._run_job(resumed)
+
+    assert [call[2] for call in analysis.calls] == [item["target_date"] for item in items[2:]]
+    assert second.get_job(job["id"])["completed_items"] == 5
+
+
+def test_job_with_a_live_lease_is_not_claimed_again(db_path, analysis):
+    first, second = _queue(db_path), _queue(db_path)
+    first.submit("calendar", _calendar(2))
+    assert first._claim_next() is not None
+    assert second._claim_next() is None
+
+
+def test_stop_hands_running_jobs_back_to_the_queue(db_path, analysis):
+    queue = _queue(db_path)
+    job = queue.submit("calendar", _calendar(2))
+    queue._claim_next()
+    queue.stop()
+    assert queue.get_job(job["id"])["status"] == JOB_QUEUED
+    assert _queue(db_path)._claim_next()["id"] == job["id"]
+
+
+def test_result_recorded_twice_is_counted_once(db_path, analysis):
+    queue = _queue(db_path)
+    job = queue.submit("calendar", _calendar(2))
+    item = expand_job_items("calendar", job["params"])[0]
+    for _ in range(2):
+        queue._record_result(job["id"], 0, item, {"error": "no data"})
+    recorded = queue.get_job(job["id"])
+    assert (recorded["completed_items"], recorded["failed_items"]) == (1, 1)
+
+
+def test_cancel_stops_a_running_job_before_the_next_item(db_path, analysis):
+    queue = _queue(db_path)
+    job = queue.submit("calendar", _calendar(20))
+    analysis.on_call = lambda count: count == 3 and queue.cancel(job["id"])
+    queue._run_job(queue._claim_next())
+
+    assert len(analysis.calls) == 3
+    assert queue.get_job(job["id"])["status"] == JOB_CANCELLED
+    assert not queue.cancel(job["id"])
+
+
+def test_finished_jobs_expire(db_path, analysis):
+    queue = _queue(db_path, result_ttl_seconds=0)
+    job = queue.submit("calendar", _calendar(2))
+    queue._run_job(queue._claim_next())
+    time.sleep(0.01)
+
+    assert queue.get_job(job["id"]) is None
+    assert queue.purge_expired() == 1
+    assert queue.get_results(job["id"]) == []
+
+
+def test_two_queues_on_one_database_run_each_item_once(db_path, analysis):
+    queues = [_queue(db_path), _queue(db_path)]
+    jobs = [queues[0].submit("region", _region()) for _ in range(4)]
+    analysis.on_call = lambda count: time.sleep(0.01)
+    for queue in queues:
+        queue.start()
+    try:
+        deadline = time.monotonic() + 10
+        while any(queues[0].get_job(job["id"])["status"] in (JOB_QUEUED, JOB_RUNNING)
+                  for job in jobs):
+            assert time.monotonic() < deadline, "jobs did not finish"
+            time.sleep(0.05)
+    finally:
+        for queue in queues:
+            queue.stop()
+
+    for job in jobs:
+        finished = queues[0].get_job(job["id"])
+        assert finished["status"] == JOB_COMPLETED
+        assert finished["completed_items"] == 8
+    assert len(analysis.calls) == 8 * len(jobs)
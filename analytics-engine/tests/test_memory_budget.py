@@ -0,0 +1,26 @@
+"""
+Peak-allocation budgets for the analysis pipeline.
+
+Each stage of benchmarks.memory_budget is run under tracemalloc against the
+synthetic grid cell, and its peak allocation must stay within the stage's
+budget in BUDGETS_KIB.
+"""
+
+import pytest
+
+from benchmarks.memory_budget import BUDGETS_KIB, peak_allocation, stages
+
+
+STAGES = dict(stages())
+
+
+@pytest.mark.parametrize("name", list(BUDGETS_KIB))
+def test_stage_within_memory_budget(name):
+    peak_kib = peak_allocation(STAGES[name], repeat=3) / 1024
+    assert peak_kib <= BUDGETS_KIB[name], (
+        f"{name} peaked at {peak_kib:.1f} KiB, over its {BUDGETS_KIB[name]} KiB budget"
+    )
+
+
+def test_every_stage_has_a_budget():
+    assert set(STAGES) == set(BUDGETS_KIB)
@@ -0,0 +1,88 @@
+"""
+Behaviour of the request-count sketch and its persistence.
+"""
+
+import numpy as np
+import pytest
+
+from src.core.prefetcher import CountMinSketch, Prefetcher
+
+
+def _prefetcher(path, top_k=4):
+    return Prefetcher(sketch_path=str(path), top_k=top_k, min_requests=1.0,
+                      interval_seconds=60, max_fetches_per_round=1, round_seconds=1)
+
+
+def _record(prefetcher, cell, count):
+    for _ in range(count):
+        prefetcher.record(*cell)
+
+
+def test_sketch_counts_never_underestimate():
+    sketch = CountMinSketch(width=64, depth=4, half_life_seconds=3600)
+    for index in range(200):
+        sketch.add((float(index), 0.0), count=index % 5 + 1)
+    for index in range(200):
+        assert sketch.estimate((float(index), 0.0)) >= index % 5 + 1
+
+
+def test_sketch_counts_halve_every_half_life():
+    sketch = CountMinSketch(width=64, depth=4, half_life_seconds=100)
+    sketch.add((1.0, 2.0), count=8)
+    sketch.decay(sketch.decayed_at + 200)
+    assert sketch.estimate((1.0, 2.0)) == pytest.approx(2.0)
+    # Time running backwards leaves the counts alone.
+    sketch.decay(sketch.decayed_at - 50)
+    assert sketch.estimate((1.0, 2.0)) == pytest.approx(2.0)
+
+
+def test_top_cells_are_ranked_and_filtered(tmp_path):
+    prefetcher = _prefetcher(tmp_path / "sketch.npz")
+    _record(prefetcher, (10.0, 20.0), 5)
+    _record(prefetcher, (30.0, 40.0), 2)
+    _record(prefetcher, (-10.0, -20.0), 0)
+    ranked = [cell for cell, _ in prefetcher.top_cells()]
+    assert ranked == [(10.0, 20.0), (30.0, 40.0)]
+
+
+def test_candidate_set_stays_bounded(tmp_path):
+    prefetcher = _prefetcher(tmp_path / "sketch.npz", top_k=2)
+    for index in range(20):
+        prefetcher.record(float(index), 0.0)
+    assert prefetcher.stats()["tracked_cells"] <= 8
+
+
+def test_save_is_skipped_until_the_sketch_is_loaded(tmp_path):
+    path = tmp_path / "sketch.npz"
+    prefetcher = _prefetcher(path)
+    _record(prefetcher, (10.0, 20.0), 3)
+    prefetcher.save()
+    assert not path.exists()
+
+
+def test_loading_merges_saved_counts_with_requests_since_startup(tmp_path):
+    path = tmp_path / "sketch.npz"
+    before_restart = _prefetcher(path)
+    before_restart.load()
+    _record(before_restart, (10.0, 20.0), 4)
+    _record(before_restart, (30.0, 40.0), 1)
+    before_restart.save()
+
+    after_restart = _prefetcher(path)
+    # Requests served before warm-up loads the sketch are kept.
+    _record(after_restart, (30.0, 40.0), 5)
+    _record(after_restart, (50.0, 60.0), 2)
+    after_restart.load()
+
+    counts = dict(after_restart.top_cells())
+    assert counts[(10.0, 20.0)] == pytest.approx(4, rel=1e-3)
+    assert counts[(30.0, 40.0)] == pytest.approx(6, rel=1e-3)
+    assert counts[(50.0, 60.0)] == pytest.approx(2, rel=1e-3)
+
+
+def test_sketch_with_other_dimensions_is_ignored(tmp_path):
+    path = tmp_path / "sketch.npz"
+    np.savez(path, counters=np.ones((1, 3)), decayed_at=0.0, candidates=np.zeros((0, 2)))
+    prefetcher = _prefetcher(path)
+    prefetcher.load()
+    assert prefetcher.top_cells() == []
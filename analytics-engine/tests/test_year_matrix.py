@@ -0,0 +1,116 @@
+"""
+Behaviour of the year × day-of-year layout and the analyses built on it.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.weather_analyzer import _trend_slopes, analyze_year_matrix
+from src.core.year_matrix import (
+    DAYS_PER_ROW, YearMatrix, day_slot, resolve_year_range, window_slots
+)
+
+
+TEMPERATURE_COLUMNS = ("Avg_Temperature_C", "Min_Temperature_C", "Max_Temperature_C")
+
+
+def _matrix(first_year, last_year, value=lambda dates: np.zeros(len(dates))):
+    """A matrix of daily data from first_year to last_year for the temperature columns."""
+    dates = pd.date_range(f"{first_year}-01-01", f"{last_year}-12-31")
+    yyyymmdd = (dates.year * 10000 + dates.month * 100 + dates.day).to_numpy()
+    values = value(dates)
+    return YearMatrix.from_columns(yyyymmdd, {name: values for name in TEMPERATURE_COLUMNS})
+
+
+# --- Slots ---
+
+def test_every_day_after_february_keeps_its_slot_in_any_year():
+    assert day_slot(2, 29) == 59
+    assert day_slot(3, 1) == 60
+    assert day_slot(12, 31) == DAYS_PER_ROW - 1
+
+
+def test_february_29_is_missing_in_non_leap_years():
+    matrix = _matrix(2020, 2021, value=lambda dates: dates.dayofyear.to_numpy(dtype=float))
+    column = matrix.columns["Avg_Temperature_C"]
+    assert column[0, day_slot(2, 29)] == 60
+    assert np.isnan(column[1, day_slot(2, 29)])
+    assert column[1, day_slot(3, 1)] == 60
+
+
+def test_window_spanning_february_includes_the_leap_day_slot():
+    slots, offsets = window_slots(datetime(2025, 2, 14), datetime(2025, 3, 16), datetime(2025, 3, 1))
+    assert slots[0] == day_slot(2, 14) and slots[-1] == day_slot(3, 16)
+    assert day_slot(2, 29) in slots
+    assert not offsets.any()
+
+
+def test_window_crossing_the_new_year_spans_two_rows():
+    matrix = _matrix(2000, 2003, value=lambda dates: dates.year.to_numpy(dtype=float))
+    slots, offsets = window_slots(datetime(2024, 12, 21), datetime(2025, 1, 20), datetime(2025, 1, 5))
+    assert len(slots) == 31
+    assert set(offsets.tolist()) == {-1, 0}
+
+    first, last = matrix.complete_years(offsets)
+    assert (first, last) == (2001, 2003)
+    window = matrix.window("Avg_Temperature_C", slots, offsets, first, last)
+    assert window.shape == (3, 31)
+    # Each row combines December of the previous year with January of its own.
+    np.testing.assert_array_equal(window[0, :11], 2000)
+    np.testing.assert_array_equal(window[0, 11:], 2001)
+
+
+def test_window_within_a_year_is_a_view():
+    matrix = _matrix(2000, 2002)
+    slots, offsets = window_slots(datetime(2025, 6, 1), datetime(2025, 7, 1), datetime(2025, 6, 16))
+    window = matrix.window("Avg_Temperature_C", slots, offsets, 2000, 2002)
+    assert window.base is not None
+    assert window.shape == (3, 31)
+
+
+# --- Year ranges ---
+
+@pytest.mark.parametrize("options, expected", [
+    ({}, (2000, 2009)),
+    ({"start_year": 1990, "end_year": 2030}, (2000, 2009)),
+    ({"start_year": 2003, "end_year": 2005}, (2003, 2005)),
+    ({"recent_years": 3}, (2007, 2009)),
+    ({"recent_years": 3, "end_year": 2004}, (2002, 2004)),
+    ({"start_year": 2020}, (2020, 2009)),
+])
+def test_year_range_is_clipped_to_complete_windows(options, expected):
+    matrix = _matrix(2000, 2009)
+    _, offsets = window_slots(datetime(2025, 6, 1), datetime(2025, 7, 1), datetime(2025, 6, 16))
+    assert resolve_year_range(matrix, offsets, **options) == expected
+
+
+# --- Trends ---
+
+def test_trend_slope_is_reported_per_decade_and_skips_missing_years():
+    years = np.arange(2000, 2006)
+    series = np.array([
+        [1.0, 1.2, np.nan, 1.6, 1.8, 2.0],
+        [5.0, np.nan, np.nan, np.nan, np.nan, 6.0],
+    ])
+    slopes = _trend_slopes(years, series)
+    assert slopes[0] == pytest.approx(2.0)
+    assert np.isnan(slopes[1])
+
+
+def test_analysis_reports_linear_warming_trend():
+    matrix = _matrix(2000, 2009, value=lambda dates: 10 + 0.3 * (dates.year.to_numpy() - 2000))
+    result = analyze_year_matrix(matrix, "2025-06-16", metrics=["temperature"],
+                                 include_yearly=True, include_trend=True)
+
+    assert result["year_range"] == {"start_year": 2000, "end_year": 2009}
+    assert result["total_years_analyzed"] == 10
+    assert result["yearly"]["temperature"]["average_c"][:2] == [10.0, 10.3]
+    assert result["trend"]["temperature"]["average_c_per_decade"] == pytest.approx(3.0)
+
+
+def test_conflicting_year_options_are_rejected():
+    with pytest.raises(ValueError):
+        analyze_year_matrix(_matrix(2000, 2002), "2025-06-16", start_year=2000, recent_years=2)